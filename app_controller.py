@@ -25,6 +25,8 @@ class RAGifyController:
             'last_result': None,
             'last_query': None,
             'last_processed_query': None,
+            'warm_start_checked': False,
+            'ingest_job': None,
             'groq_key': ""
         }
         
@@ -32,68 +34,111 @@ class RAGifyController:
             if key not in st.session_state:
                 st.session_state[key] = value
     
-    def load_documentation(self) -> bool:
-        """Load and process API documentation"""
+    def load_documentation(self):
+        """Start (or join) the background documentation load; its progress is followed on every run"""
         try:
-            from src.scraper import APIDocsScraper
-            from src.embeddings import EmbeddingsManager
-            from src.rag import SmartAPIAssistant
+            from src.jobs import get_ingest_jobs
             from src.utils import API_DOCS_URLS
             
-            progress, status = self.ui.show_loading_progress("🔧 Initializing...", 0)
+            urls = [url for urls_list in API_DOCS_URLS.values() for url in urls_list]
+            st.session_state.ingest_job = get_ingest_jobs().start(urls)
             
-            scraper = APIDocsScraper(delay=0.5)
-            progress.progress(0.25)
+        except Exception as e:
+            st.error(f"⚠️ Error: {e}")
+    
+    def warm_start(self) -> bool:
+        """Become query-ready straight away when the persisted collection matches the configured docs"""
+        try:
+            from src.embeddings import corpus_is_current
+            from src.utils import API_DOCS_URLS, WARM_START, WARM_START_REFRESH
             
-            status.text("📋 Collecting documentation...")
             urls = [url for urls_list in API_DOCS_URLS.values() for url in urls_list]
-            progress.progress(0.5)
+            if not WARM_START or not corpus_is_current(urls):
+                return False
             
-            status.text(f"📖 Processing {len(urls)} pages...")
-            docs = [doc for url in urls if 'error' not in (doc := scraper.scrape_url(url))]
-            progress.progress(0.75)
+            from src.jobs import get_ingest_jobs
             
-            status.text("🧠 Creating knowledge base...")
-            embeddings = EmbeddingsManager()
-            docs_added = embeddings.add_documents(docs)
-            st.session_state.rag_assistant = SmartAPIAssistant()
+            # The assistant (and with it the embedding model) is created by the first question
             st.session_state.docs_loaded = True
-            progress.progress(1.0)
-            
-            self.ui.show_success_status(f"✨ Ready! Loaded {docs_added} documentation chunks")
+            if WARM_START_REFRESH:
+                # Conditional requests make this cheap; answers switch over as pages are rewritten
+                get_ingest_jobs().start(urls)
             return True
             
         except Exception as e:
-            st.error(f"⚠️ Error: {e}")
+            st.warning(f"⚠️ Could not reuse the stored documentation: {e}")
             return False
     
+    def follow_ingest_job(self, job) -> bool:
+        """Show a running job's live progress without blocking the script run, or take over its result once done.
+        
+        Returns True when the job finished successfully in this run.
+        """
+        from src.rag import SmartAPIAssistant
+        
+        if job.running:
+            self.ui.show_ingest_progress(job.progress)
+            return False
+        
+        st.session_state.ingest_job = None
+        if job.status == "failed":
+            st.error(f"⚠️ Error: {job.error}")
+            return False
+        
+        st.session_state.rag_assistant = SmartAPIAssistant()
+        st.session_state.docs_loaded = True
+        self.ui.show_success_status(
+            f"✨ Ready! Updated {job.result['chunks_written']} of "
+            f"{job.result['total_documents']} documentation chunks"
+        )
+        return True
+    
+    def get_assistant(self):
+        """The session's assistant, created on first use once documentation is available"""
+        if st.session_state.rag_assistant is None and st.session_state.docs_loaded:
+            from src.rag import SmartAPIAssistant
+            
+            with st.spinner("🧠 Loading search models..."):
+                st.session_state.rag_assistant = SmartAPIAssistant()
+        return st.session_state.rag_assistant
+    
+    def active_ingest_job(self):
+        """The ingest job currently running in this process, if any"""
+        from src.jobs import get_ingest_jobs
+        return get_ingest_jobs().active()
+    
     def process_question(self, question: str) -> Dict[str, Any]:
         """Process a user question and return response"""
         st.session_state.current_query = question
         
-        if not st.session_state.rag_assistant:
-            return {"response": "Please load documentation first.", "sources": []}
-        
-        with st.spinner("🔍 Searching knowledge base..."):
-            try:
-                result = st.session_state.rag_assistant.search_and_respond(
+        try:
+            assistant = self.get_assistant()
+            if not assistant:
+                return {"response": "Please load documentation first.", "sources": []}
+            
+            with st.spinner("🔍 Searching knowledge base..."):
+                result = assistant.search_and_stream(
                     question, 
-                    st.session_state.conversation
+                    st.session_state.conversation,
+                    source=self.ui.selected_source()
                 )
-                
-                st.session_state.last_result = result
-                st.session_state.last_query = question
-                st.session_state.conversation.extend([
-                    {"role": "user", "content": question},
-                    {"role": "assistant", "content": result["response"]}
-                ])
-                
-                return result
-                
-            except Exception as e:
-                error_msg = f"⚠️ Error processing question: {e}"
-                st.error(error_msg)
-                return {"response": error_msg, "sources": []}
+            
+            # Tokens are painted as they arrive; the spinner only covers retrieval
+            result["response"] = self.ui.render_streaming_response(result.pop("stream"))
+            
+            st.session_state.last_result = result
+            st.session_state.last_query = question
+            st.session_state.conversation.extend([
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": result["response"]}
+            ])
+            
+            return result
+            
+        except Exception as e:
+            error_msg = f"⚠️ Error processing question: {e}"
+            st.error(error_msg)
+            return {"response": error_msg, "sources": []}
     
     def handle_question_click(self, question: str):
         """Handle when a quick question is clicked"""
@@ -124,15 +169,24 @@ class RAGifyController:
         if groq_key:
             st.session_state.groq_key = groq_key
         
-        # Handle load documentation
+        # Handle load documentation; a load already running (e.g. before a refresh) is rejoined
         if load_docs_clicked:
-            if self.load_documentation():
-                st.rerun()
+            self.load_documentation()
+        elif (not st.session_state.get('docs_loaded') and st.session_state.ingest_job is None
+              and (job := self.active_ingest_job())):
+            st.session_state.ingest_job = job
+        
+        # Progress renders in a self-refreshing fragment, so the rest of the page keeps rendering
+        if st.session_state.ingest_job is not None and self.follow_ingest_job(st.session_state.ingest_job):
+            st.rerun()
         
         # Handle reset
         if reset_clicked:
             self.reset_application()
         
+        if st.session_state.get('rag_assistant'):
+            self.ui.render_cache_stats(st.session_state.rag_assistant.cache_stats())
+        
         # Render main interface
         query = self.ui.render_main_interface(
             groq_key, 
@@ -152,6 +206,14 @@ class RAGifyController:
         # Show quick questions if docs are loaded
         if st.session_state.get('docs_loaded', False):
             self.ui.render_quick_questions(self.handle_question_click)
+        
+        # Reuse documentation persisted by an earlier run (needs the key, which the LLM client reads).
+        # Checked last, so the page is already painted while the vector store is opened
+        if (groq_key and not st.session_state.docs_loaded and not st.session_state.warm_start_checked
+                and st.session_state.ingest_job is None):
+            st.session_state.warm_start_checked = True
+            if not load_docs_clicked and self.warm_start():
+                st.rerun()
 
 def main():
     """Entry point for the application"""
@@ -0,0 +1,127 @@
+"""Sweep HNSW settings for recall against exact search versus query latency, per corpus size.
+
+Vectors are clustered synthetic unit vectors, or a sample of a persisted collection's
+embeddings with --store. Recall@k compares Chroma's results with exact cosine top-k.
+Every setting gets a freshly built index: Chroma only applies a changed search_ef to
+indexes it loads afterwards, and a sweep would otherwise keep querying the old one.
+
+Usage:
+  python -m benchmarks.bench_ann [--sizes 1000,10000] [--m 8,16,32] [--construction-ef 100,200]
+                                 [--search-ef 10,25,50,100,200] [--target-recall 0.95]
+  python -m benchmarks.bench_ann --store ./chroma_db --sizes 5000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import percentiles, timer
+from src import resources
+from src.embeddings import hnsw_metadata, index_settings
+from src.utils import SEARCH_OVERFETCH
+
+
+def ints(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_vectors(count: int, dim: int, rng: np.random.Generator, clusters: int = 64) -> np.ndarray:
+    # Documentation embeddings cluster by topic; uniform random vectors would make every query equally hard
+    centers = rng.normal(size=(clusters, dim))
+    members = rng.integers(0, clusters, size=count)
+    return unit(centers[members] + rng.normal(scale=0.6, size=(count, dim))).astype(np.float32)
+
+
+def store_vectors(path: str, count: int, rng: np.random.Generator) -> np.ndarray:
+    collection = resources.get_chroma_client(path).get_collection("api_docs")
+    embeddings = np.asarray(collection.get(include=['embeddings'])['embeddings'], dtype=np.float32)
+    if len(embeddings) < count:
+        raise SystemExit(f"{path} holds {len(embeddings)} vectors; ask for --sizes up to that")
+    return unit(embeddings[rng.choice(len(embeddings), size=count, replace=False)])
+
+
+def build(client, vectors: np.ndarray, settings, batch: int = 1000):
+    name = f"sweep-{settings['M']}-{settings['construction_ef']}-{settings['search_ef']}-{len(vectors)}"
+    collection = client.create_collection(name, metadata=hnsw_metadata(settings))
+    with timer() as t:
+        for i in range(0, len(vectors), batch):
+            collection.add(ids=[str(j) for j in range(i, min(i + batch, len(vectors)))],
+                           embeddings=vectors[i:i + batch])
+    return collection, t["seconds"]
+
+
+def measure(collection, queries: np.ndarray, exact: np.ndarray, k: int):
+    latencies, hits = [], 0
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        found = collection.query(query_embeddings=[query], n_results=k, include=[])['ids'][0]
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(map(int, found)) & set(truth.tolist()))
+    return hits / (len(queries) * k), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=ints, default=[1000, 10000], help="comma-separated corpus sizes")
+    parser.add_argument("--m", type=ints, default=[8, 16, 32], help="HNSW graph degrees to try")
+    parser.add_argument("--construction-ef", type=ints, default=[100, 200], help="build-time candidate list sizes")
+    parser.add_argument("--search-ef", type=ints, default=[10, 25, 50, 100, 200], help="query-time candidate list sizes")
+    parser.add_argument("--space", default="cosine", choices=["cosine", "l2", "ip"])
+    parser.add_argument("--k", type=int, default=5 * SEARCH_OVERFETCH,
+                        help="neighbours per query (default: 5 results x SEARCH_OVERFETCH)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384, help="dimension of synthetic vectors")
+    parser.add_argument("--store", help="sample vectors from this persisted Chroma directory instead")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="recall the recommendation must reach")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results, recommendations = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        client = resources.get_chroma_client(tmp)
+        for size in args.sizes:
+            vectors = store_vectors(args.store, size, rng) if args.store else synthetic_vectors(size, args.dim, rng)
+            # Queries are perturbed corpus vectors: close to real content, never exact duplicates
+            picks = rng.choice(size, size=min(args.queries, size), replace=False)
+            queries = unit(vectors[picks] + rng.normal(scale=0.3 / np.sqrt(vectors.shape[1]), size=(len(picks), vectors.shape[1])))
+            exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+            print(f"\n{size} vectors, {len(queries)} queries, recall@{args.k}")
+            print(f"{'M':>4} {'constr_ef':>9} {'search_ef':>9} {'build_s':>8} {'recall':>7} {'p50_ms':>7} {'p95_ms':>7}")
+            for m in args.m:
+                for construction_ef in args.construction_ef:
+                    for search_ef in args.search_ef:
+                        settings = index_settings(args.space, m, construction_ef, search_ef)
+                        collection, build_seconds = build(client, vectors, settings)
+                        recall, latencies = measure(collection, queries, exact, args.k)
+                        client.delete_collection(collection.name)
+                        row = {"size": size, **settings, "build_seconds": round(build_seconds, 3),
+                               "recall": round(recall, 4), **percentiles(latencies)}
+                        results.append(row)
+                        print(f"{m:>4} {construction_ef:>9} {search_ef:>9} {build_seconds:>8.2f} {recall:>7.3f} "
+                              f"{row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f}")
+            good = [row for row in results if row["size"] == size and row["recall"] >= args.target_recall]
+            if good:
+                best = min(good, key=lambda row: (row["p95_ms"], row["build_seconds"]))
+                recommendations[size] = {key: best[key] for key in ("M", "construction_ef", "search_ef", "recall", "p95_ms")}
+                print(f"-> fastest with recall >= {args.target_recall}: HNSW_M={best['M']} "
+                      f"HNSW_CONSTRUCTION_EF={best['construction_ef']} HNSW_SEARCH_EF={best['search_ef']}")
+            else:
+                print(f"-> no setting reached recall {args.target_recall}; try larger ef values")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"k": args.k, "space": args.space, "store": args.store, "results": results,
+                       "recommendations": recommendations}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare encoder backends (PyTorch, ONNX fp32, ONNX int8): load time, throughput, peak memory and parity.
+
+Each backend runs in a fresh process, so load time and peak resident memory
+are what a newly started app or service worker pays. Parity is the cosine
+between each backend's embeddings and PyTorch's for the same chunks. ONNX
+exports are made (once, into EMBED_ONNX_DIR) before anything is timed.
+
+Usage: python -m benchmarks.bench_encoder [--backends torch,onnx,onnx-int8] [--chunks 1024] [--batch-size 32]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import synthetic_chunks, timer
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss survives fork and exec, so it would report the parent's peak; VmHWM is this process's own
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def child(args):
+    from src import resources
+    from src.utils import EMBEDDING_MODEL
+    with timer() as load:
+        model = resources.get_embedding_model(EMBEDDING_MODEL, args.child)
+    texts = synthetic_chunks(args.chunks)
+    model.encode(texts[:args.batch_size], batch_size=args.batch_size, show_progress_bar=False)
+    with timer() as t:
+        embeddings = model.encode(texts, batch_size=args.batch_size, show_progress_bar=False)
+    np.save(args.embeddings, np.asarray(embeddings, dtype=np.float32))
+    print(json.dumps({"backend": args.child, "loaded": type(model).__name__, "torch_imported": "torch" in sys.modules,
+                      "load_seconds": round(load["seconds"], 3), "encode_seconds": round(t["seconds"], 3),
+                      "chunks_per_sec": round(len(texts) / t["seconds"], 1), "peak_rss_mb": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="comma-separated EMBED_BACKEND values")
+    parser.add_argument("--chunks", type=int, default=1024, help="number of synthetic chunks to encode")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    from src.onnx_encoder import load_onnx_encoder
+    from src.resources import EMBED_BACKENDS
+    from src.utils import EMBED_ONNX_DIR, EMBEDDING_MODEL
+    backends = args.backends.split(",")
+    for backend in backends:
+        if EMBED_BACKENDS.get(backend):
+            try:
+                load_onnx_encoder(EMBEDDING_MODEL, EMBED_ONNX_DIR, EMBED_BACKENDS[backend], min_parity=-1.0)
+            except Exception as e:
+                print(f"{backend}: export failed ({e}); it will fall back to torch", file=sys.stderr)
+
+    results, embeddings = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            path = os.path.join(tmp, f"{backend}.npy")
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_encoder", "--child", backend,
+                                     "--chunks", str(args.chunks), "--batch-size", str(args.batch_size),
+                                     "--embeddings", path], capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+            embeddings[backend] = np.load(path)
+
+    reference = embeddings.get("torch")
+    for row in results:
+        if reference is not None:
+            cosines = np.sum(reference * embeddings[row["backend"]], axis=1)
+            row["parity_min_cosine"] = round(float(cosines.min()), 6)
+        print(f"{row['backend']:10s} ({row['loaded']}) load {row['load_seconds']:6.2f}s  "
+              f"{row['chunks_per_sec']:8.1f} chunks/sec  peak RSS {row['peak_rss_mb']:7.1f}MB"
+              + (f"  parity {row['parity_min_cosine']:.5f}" if "parity_min_cosine" in row else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"chunks": args.chunks, "batch_size": args.batch_size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Measure embedding throughput (chunks/sec) for 1..N encoder processes.
+
+Usage: python -m benchmarks.bench_encoding [--chunks 4096] [--max-workers 4] [--batch-size 1024]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import synthetic_chunks, timer
+from src.embeddings import EmbeddingsManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=4096, help="number of synthetic chunks to encode")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="largest worker count to try")
+    parser.add_argument("--batch-size", type=int, default=1024, help="chunks per create_embeddings call")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    
+    texts = synthetic_chunks(args.chunks)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in range(1, args.max_workers + 1):
+            manager = EmbeddingsManager(persist_path=tmp, workers=workers)
+            # Warm up (and start the process pool) outside the timed region
+            manager.create_embeddings(texts[:args.batch_size])
+            with timer() as t:
+                for i in range(0, len(texts), args.batch_size):
+                    manager.create_embeddings(texts[i:i + args.batch_size])
+            rate = len(texts) / t["seconds"]
+            results.append({"workers": workers, "seconds": round(t["seconds"], 3), "chunks_per_sec": round(rate, 1)})
+            print(f"workers={workers}: {rate:8.1f} chunks/sec ({t['seconds']:.2f}s)")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"chunks": args.chunks, "batch_size": args.batch_size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
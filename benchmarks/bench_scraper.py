@@ -0,0 +1,43 @@
+"""Compare sequential and concurrent scraping against local stub hosts.
+
+Usage: python -m benchmarks.bench_scraper [--hosts 3] [--pages 4] [--latency 0.3] [--delay 0.1]
+"""
+
+import argparse
+
+from benchmarks.common import stub_hosts, timer
+from src.scraper import APIDocsScraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=3, help="number of stub hosts (vendors)")
+    parser.add_argument("--pages", type=int, default=4, help="pages per host")
+    parser.add_argument("--latency", type=float, default=0.3, help="server latency per page in seconds")
+    parser.add_argument("--delay", type=float, default=0.1, help="politeness delay per host in seconds")
+    parser.add_argument("--per-host", type=int, default=2, help="max in-flight requests per host")
+    args = parser.parse_args()
+    
+    with stub_hosts(args.hosts, args.latency) as servers:
+        urls = [f"{server.base_url}/docs/page-{i}" for server in servers for i in range(args.pages)]
+        
+        sequential = APIDocsScraper(delay=args.delay)
+        with timer() as seq:
+            seq_docs = [sequential.scrape_url(url) for url in urls]
+        
+        concurrent = APIDocsScraper(delay=args.delay, per_host=args.per_host)
+        with timer() as conc:
+            conc_docs = concurrent.scrape_urls(urls)
+    
+    failures = sum('error' in doc for doc in seq_docs + conc_docs)
+    print(f"{len(urls)} pages across {args.hosts} hosts "
+          f"(latency {args.latency}s, delay {args.delay}s, per-host {args.per_host})")
+    print(f"  sequential: {seq['seconds']:.2f}s")
+    print(f"  concurrent: {conc['seconds']:.2f}s")
+    print(f"  speedup:    {seq['seconds'] / conc['seconds']:.1f}x")
+    if failures:
+        print(f"  failures:   {failures}")
+
+
+if __name__ == "__main__":
+    main()
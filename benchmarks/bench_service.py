@@ -0,0 +1,92 @@
+"""Load-test the headless Q&A service offline: stub docs, stub LLM, concurrent HTTP clients.
+
+Usage: python -m benchmarks.bench_service [--requests 200] [--clients 32] [--llm-latency 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+# The service reads its store location at import time, so point it at a scratch directory first
+os.environ.setdefault("CHROMA_DB_PATH", tempfile.mkdtemp(prefix="ragify-bench-"))
+
+from benchmarks.common import stub_hosts, timer
+from src.jobs import get_ingest_jobs
+from src.llm import StubBackend
+from src.rag import SmartAPIAssistant
+from src.service import QueryBatcher, RAGService
+
+
+async def post_query(port: int, query: str) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps({"query": query}).encode()
+    writer.write(f"POST /query HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+    return status
+
+
+async def run_load(service: RAGService, requests: int, clients: int, unique: int):
+    server = await service.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"How do I page through results with cursor {i % unique}?")
+    statuses, latencies = [], []
+
+    async def client():
+        while not queue.empty():
+            query = queue.get_nowait()
+            start = asyncio.get_running_loop().time()
+            statuses.append(await post_query(port, query))
+            latencies.append(asyncio.get_running_loop().time() - start)
+
+    with timer() as t:
+        await asyncio.gather(*(client() for _ in range(clients)))
+    server.close()
+    await server.wait_closed()
+    return statuses, sorted(latencies), t["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="total queries to send")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--unique", type=int, default=50, help="distinct query texts (the rest are repeats)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub LLM seconds per answer")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    with stub_hosts(2, 0.01) as servers:
+        urls = [f"{server.base_url}/docs/page-{i}" for server in servers for i in range(10)]
+        get_ingest_jobs().start(urls).wait()
+
+    assistant = SmartAPIAssistant(llm=StubBackend(args.llm_latency))
+    service = RAGService(assistant, args.max_concurrency, args.max_queue,
+                         QueryBatcher(assistant.embeddings_manager.embed_queries, args.batch_window_ms / 1000))
+    statuses, latencies, seconds = asyncio.run(run_load(service, args.requests, args.clients, args.unique))
+
+    ok = statuses.count(200)
+    result = {
+        "requests": args.requests, "clients": args.clients, "ok": ok, "rejected": statuses.count(503),
+        "seconds": round(seconds, 3), "throughput_rps": round(ok / seconds, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "batching": service.batcher.stats
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
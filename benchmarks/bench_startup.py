@@ -0,0 +1,124 @@
+"""Profile startup: import time per module, time to first page render, and budgets for both.
+
+Every measurement runs in a fresh interpreter. The import profile comes from
+``python -X importtime``; the first render runs app.py once through Streamlit's
+AppTest, without a Groq key, as a new visitor sees it. The run fails (exit 1)
+when ``import src`` or the first render exceeds its budget, or either loads one
+of the heavy modules that should wait until retrieval is first needed.
+
+Usage:
+  python -m benchmarks.bench_startup [--budget-import-ms 150] [--budget-render-ms 1500]
+  python -m benchmarks.bench_startup --profile src.rag [--top 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded lazily by src; any of them at startup means an eager import crept back in
+HEAVY_MODULES = ("chromadb", "torch", "sentence_transformers", "transformers", "onnxruntime", "groq")
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}}))
+"""
+
+RENDER_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=120).run()
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules),
+                  "errors": [str(e.value) for e in app.exception]}))
+"""
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+
+
+def measure(script: str, repeat: int) -> Dict:
+    runs = [json.loads(run_python(["-c", script]).stdout.strip().splitlines()[-1]) for _ in range(repeat)]
+    return {"ms": round(statistics.median(r["seconds"] for r in runs) * 1000, 1),
+            "heavy_modules": [m for m in HEAVY_MODULES if m in runs[-1]["modules"]],
+            "errors": runs[-1].get("errors", [])}
+
+
+def import_profile(module: str) -> List[Dict]:
+    """Self and cumulative import time of every module ``import module`` loads, from -X importtime."""
+    stderr = run_python(["-X", "importtime", "-c", f"import {module}"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return rows
+
+
+def print_profile(module: str, top: int):
+    rows = import_profile(module)
+    packages = defaultdict(float)
+    for row in rows:
+        packages[row["module"].split(".")[0]] += row["self_ms"]
+    total = next((row["cumulative_ms"] for row in rows if row["module"] == module), sum(packages.values()))
+    print(f"\nimport {module}: {total:.1f}ms, {len(rows)} modules")
+    print(f"{'package':40s} {'self ms':>9}")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:40s} {ms:>9.1f}")
+    print(f"\n{'module':60s} {'self ms':>9} {'cumul ms':>9}")
+    for row in sorted(rows, key=lambda row: -row["self_ms"])[:top]:
+        print(f"{row['module']:60s} {row['self_ms']:>9.1f} {row['cumulative_ms']:>9.1f}")
+    return {"module": module, "total_ms": total, "packages": dict(packages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-import-ms", type=float, default=150, help="budget for `import src`")
+    parser.add_argument("--budget-render-ms", type=float, default=1500, help="budget for the first page render")
+    parser.add_argument("--profile", action="append", default=[],
+                        help="print the per-module import profile of this module (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="rows per profile table")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per timing (median is kept)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {"import_src": measure(IMPORT_SCRIPT.format(module="src"), args.repeat),
+               "import_src_utils": measure(IMPORT_SCRIPT.format(module="src.utils"), args.repeat),
+               "first_render": measure(RENDER_SCRIPT, args.repeat)}
+    results["profiles"] = [print_profile(module, args.top) for module in args.profile]
+
+    failures = []
+    for name, budget in (("import_src", args.budget_import_ms), ("import_src_utils", args.budget_import_ms),
+                         ("first_render", args.budget_render_ms)):
+        row = results[name]
+        status = "ok"
+        if row["ms"] > budget:
+            status = f"OVER BUDGET ({budget:.0f}ms)"
+        elif row["heavy_modules"]:
+            status = f"LOADS {', '.join(row['heavy_modules'])}"
+        elif row["errors"]:
+            status = f"ERROR {row['errors'][0]}"
+        if status != "ok":
+            failures.append(name)
+        print(f"{name:18s} {row['ms']:>8.1f}ms  {status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budgets": {"import_ms": args.budget_import_ms, "render_ms": args.budget_render_ms},
+                       "results": results}, f, indent=2)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
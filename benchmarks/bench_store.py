@@ -0,0 +1,114 @@
+"""Compare the Chroma and in-memory NumPy vector stores: build time, query latency, recall, load time and disk use.
+
+Uses clustered synthetic unit vectors with a "source" field on each chunk, queried
+both unfiltered and with a source filter, as EmbeddingsManager does.
+
+Usage: python -m benchmarks.bench_store [--sizes 1000,10000,100000] [--queries 200] [--k 15]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import ints, synthetic_vectors, unit
+from benchmarks.common import percentiles, timer
+from src import resources
+from src.embeddings import hnsw_metadata, index_settings
+from src.utils import SEARCH_OVERFETCH
+from src.vectorstore import NumpyVectorStore
+
+SOURCES = ("Claude API", "Gemini API", "GitHub API")
+
+
+def disk_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def fill(store, vectors: np.ndarray, batch: int = 1000):
+    with timer() as t:
+        for i in range(0, len(vectors), batch):
+            rows = range(i, min(i + batch, len(vectors)))
+            store.upsert(ids=[str(j) for j in rows], embeddings=vectors[i:i + batch],
+                         documents=[f"chunk {j}" for j in rows],
+                         metadatas=[{"source": SOURCES[j % len(SOURCES)], "url": f"http://docs.local/{j // 20}"}
+                                    for j in rows])
+    return t["seconds"]
+
+
+def run_queries(store, queries: np.ndarray, k: int, exact: np.ndarray, where=None):
+    latencies, hits = [], 0
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        found = store.query(query_embeddings=[query], n_results=k, where=where,
+                            include=['documents', 'metadatas', 'distances'])['ids'][0]
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(map(int, found)) & set(truth.tolist()))
+    return {**percentiles(latencies), "recall": round(hits / (len(queries) * k), 4)}
+
+
+def exact_top_k(queries: np.ndarray, vectors: np.ndarray, k: int, rows=None) -> np.ndarray:
+    scores = queries @ (vectors if rows is None else vectors[rows]).T
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return top if rows is None else rows[top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=ints, default=[1000, 10000, 100000], help="comma-separated chunk counts")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5 * SEARCH_OVERFETCH, help="results per query")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--stores", default="chroma,numpy,numpy-float16", help="stores to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            vectors = synthetic_vectors(size, args.dim, rng)
+            picks = rng.choice(size, size=min(args.queries, size), replace=False)
+            queries = unit(vectors[picks] + rng.normal(scale=0.3 / np.sqrt(args.dim), size=(len(picks), args.dim)))
+            source_rows = np.flatnonzero(np.arange(size) % len(SOURCES) == 1)
+            exact = exact_top_k(queries, vectors, args.k)
+            exact_filtered = exact_top_k(queries, vectors, args.k, source_rows)
+            print(f"\n{size} chunks, {len(queries)} queries, top {args.k}")
+            for name in args.stores.split(","):
+                path = os.path.join(tmp, f"{name}-{size}")
+                if name == "chroma":
+                    client = resources.get_chroma_client(path)
+                    store = client.create_collection("bench", metadata=hnsw_metadata(index_settings()))
+                    build_seconds = fill(store, vectors)
+                    load_seconds = None
+                else:
+                    store = NumpyVectorStore(os.path.join(path, "vectors"), dtype=name.partition("-")[2] or "float32")
+                    build_seconds = fill(store, vectors)
+                    store.save()
+                    with timer() as t:
+                        store = NumpyVectorStore(os.path.join(path, "vectors"), dtype=store.dtype.name)
+                    load_seconds = round(t["seconds"], 4)
+                row = {"size": size, "store": name, "build_seconds": round(build_seconds, 3), "load_seconds": load_seconds,
+                       "disk_mb": round(disk_bytes(path) / 1e6, 2),
+                       "query": run_queries(store, queries, args.k, exact),
+                       "filtered_query": run_queries(store, queries, args.k, exact_filtered, {"source": SOURCES[1]})}
+                results.append(row)
+                print(f"  {name:14s} build {row['build_seconds']:7.2f}s  disk {row['disk_mb']:8.2f}MB  "
+                      f"query p50 {row['query']['p50_ms']:6.2f}ms p95 {row['query']['p95_ms']:6.2f}ms "
+                      f"recall {row['query']['recall']:.3f}  filtered p50 {row['filtered_query']['p50_ms']:6.2f}ms "
+                      f"recall {row['filtered_query']['recall']:.3f}"
+                      + (f"  load {load_seconds * 1000:.1f}ms" if load_seconds is not None else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"k": args.k, "dim": args.dim, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
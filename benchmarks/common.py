@@ -0,0 +1,157 @@
+"""Shared helpers for the RAGify benchmarks: a local stub HTTP server, the fixture corpus and timing utilities."""
+
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Allow running the scripts directly (python benchmarks/bench_x.py) as well as with -m
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+STUB_PAGE = """<html><head><title>Stub API Reference {path}</title></head>
+<body><main>
+<h1>Stub API Reference</h1>
+<p>This page is served by the local benchmark stub server for {path}.</p>
+<h2>Request</h2>
+<p>Send a POST request with a JSON body containing the model and the list of messages.</p>
+<pre><code>curl -X POST https://api.example.com/v1/messages -H "x-api-key: $KEY"</code></pre>
+<h2>Response</h2>
+<p>The response contains the generated content blocks along with token usage information.</p>
+</main></body></html>"""
+
+
+class StubServer:
+    """Threaded HTTP server that answers every GET with a small docs page after ``latency`` seconds."""
+    
+    def __init__(self, latency: float = 0.2, pages: Optional[Dict[str, str]] = None):
+        self.latency = latency
+        self.pages = pages or {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+                body = server.pages.get(self.path, STUB_PAGE.format(path=self.path)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        return Handler
+    
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@contextmanager
+def stub_hosts(count: int, latency: float) -> Iterator[List[StubServer]]:
+    """Start ``count`` stub servers; each listens on its own port so it counts as a separate host."""
+    servers = [StubServer(latency) for _ in range(count)]
+    for server in servers:
+        server.__enter__()
+    try:
+        yield servers
+    finally:
+        for server in servers:
+            server.__exit__(None, None, None)
+
+
+@contextmanager
+def timer() -> Iterator[Dict[str, float]]:
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+_VOCAB = ("request response endpoint header parameter token model message stream content "
+          "authentication repository issue label assignee embedding safety setting function "
+          "schema json payload rate limit pagination cursor webhook retry timeout status code "
+          "POST GET PATCH DELETE /v1/messages /repos/{owner}/{repo} x-api-key max_tokens "
+          "temperature system prompt tool_use generateContent Authorization Bearer").split()
+
+
+def synthetic_chunks(count: int, words: int = 120, seed: int = 0) -> List[str]:
+    """Deterministic API-doc-flavoured chunks for encoder and index benchmarks."""
+    rng = random.Random(seed)
+    return [f"Title: Synthetic page {i}\n\nContent: " + " ".join(rng.choices(_VOCAB, k=words)) + "."
+            for i in range(count)]
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+    """The original fixed-size character chunker, kept as the baseline TokenChunker is measured against."""
+    if len(text) <= chunk_size: return [text]
+
+    chunks, start = [], 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            # Break at sentence or word boundary
+            sentence_end = text.rfind('.', start, end)
+            if sentence_end > start + chunk_size // 2:
+                end = sentence_end + 1
+            else:
+                word_end = text.rfind(' ', start, end)
+                if word_end > start + chunk_size // 2:
+                    end = word_end
+
+        chunk = text[start:end].strip()
+        if chunk: chunks.append(chunk)
+        start = end - overlap
+        if start >= len(text): break
+
+    return chunks
+
+
+def fixture_pages() -> Dict[str, str]:
+    """Saved docs pages from benchmarks/fixtures, keyed by the path StubServer serves them on."""
+    pages = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                pages[f"/docs/{name[:-5]}"] = f.read()
+    return pages
+
+
+def fixture_queries() -> List[str]:
+    with open(os.path.join(FIXTURES_DIR, "queries.txt"), encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentiles(samples: Iterable[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of ``samples`` (seconds), reported in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}_ms": 0.0 for p in points}
+    return {f"p{p}_ms": round(ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))] * 1000, 2)
+            for p in points}
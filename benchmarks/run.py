@@ -0,0 +1,252 @@
+"""Run the offline end-to-end benchmark suite and optionally compare against a previous run.
+
+Every stage runs against the saved pages in benchmarks/fixtures (served by a
+local stub server) and the stub LLM backend, so no network access is needed
+once the embedding model is cached.
+
+Usage:
+  python -m benchmarks.run [--repeat 3] [--output results.json]
+  python -m benchmarks.run --compare baseline.json [--tolerance 0.10]
+  python -m benchmarks.run --only scrape,parse,chunk
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# Stores are located at import time, so point them at a scratch directory first
+os.environ.setdefault("CHROMA_DB_PATH", tempfile.mkdtemp(prefix="ragify-bench-"))
+os.environ.setdefault("LLM_BACKEND", "stub")
+
+from benchmarks.common import StubServer, chunk_text, fixture_pages, fixture_queries, percentiles, timer
+
+STAGES = ("scrape", "parse", "chunk", "embed", "write", "ingest", "search", "respond")
+# Later stages consume earlier outputs (docs -> chunks -> embeddings), so prerequisites always run
+REQUIRES = {"chunk": ["parse"], "embed": ["chunk"], "write": ["embed"], "ingest": ["parse"],
+            "search": ["ingest"], "respond": ["ingest"]}
+
+
+def rate(count: float, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds else 0.0
+
+
+def bench_scrape(ctx, args):
+    from src.scraper import APIDocsScraper
+    pages = ctx["pages"]
+    scraper = APIDocsScraper(delay=0)
+    with StubServer(0.0, pages) as server:
+        urls = [f"{server.base_url}{path}" for path in pages]
+        with timer() as t:
+            for _ in range(args.repeat):
+                docs = scraper.scrape_urls(urls)
+    fetched = len(urls) * args.repeat
+    return {"pages": fetched, "failed": sum("error" in doc for doc in docs), "seconds": round(t["seconds"], 4),
+            "pages_per_sec": rate(fetched, t["seconds"]),
+            "mb_per_sec": rate(ctx["bytes"] * args.repeat / 1e6, t["seconds"])}
+
+
+def bench_parse(ctx, args):
+    from src.scraper import APIDocsScraper
+    scraper = APIDocsScraper(delay=0)
+    with timer() as t:
+        for _ in range(args.repeat):
+            docs = [scraper.parse_page(f"http://fixtures.local{path}", html) for path, html in ctx["pages"].items()]
+    ctx["docs"] = docs
+    parsed = len(docs) * args.repeat
+    return {"pages": parsed, "seconds": round(t["seconds"], 4), "pages_per_sec": rate(parsed, t["seconds"]),
+            "mb_per_sec": rate(ctx["bytes"] * args.repeat / 1e6, t["seconds"])}
+
+
+def bench_chunk(ctx, args):
+    from src.chunking import TokenChunker
+    contents = [doc["content"] for doc in ctx["docs"]]
+    size = sum(len(c.encode("utf-8")) for c in contents) * args.repeat / 1e6
+    chunker = TokenChunker.for_model(ctx["manager"].model)
+
+    results = {}
+    for name, split in (("chunk_text", chunk_text), ("token_chunker", chunker.chunk)):
+        with timer() as t:
+            for _ in range(args.repeat):
+                chunks = [chunk for content in contents for chunk in split(content)]
+        results[name] = {"chunks": len(chunks), "seconds": round(t["seconds"], 4),
+                         "chunks_per_sec": rate(len(chunks) * args.repeat, t["seconds"]),
+                         "mb_per_sec": rate(size, t["seconds"])}
+    ctx["chunks"] = chunks
+    return results
+
+
+def bench_embed(ctx, args):
+    manager = ctx["manager"]
+    chunks = ctx["chunks"]
+    manager.create_embeddings(chunks[:8])
+    with timer() as t:
+        for _ in range(args.repeat):
+            embeddings = manager.create_embeddings(chunks)
+    ctx["embeddings"] = embeddings
+    return {"chunks": len(chunks) * args.repeat, "seconds": round(t["seconds"], 4),
+            "chunks_per_sec": rate(len(chunks) * args.repeat, t["seconds"])}
+
+
+def bench_write(ctx, args):
+    from src.embeddings import EmbeddingsManager
+    chunks, embeddings = ctx["chunks"], ctx["embeddings"]
+    metadatas = [{"source": "bench", "url": f"http://fixtures.local/{i}", "title": "", "chunk_index": i}
+                 for i in range(len(chunks))]
+    total = 0.0
+    for r in range(args.repeat):
+        manager = EmbeddingsManager(collection_name=f"bench_write_{r}")
+        ids = [f"w{r}-{i}" for i in range(len(chunks))]
+        with timer() as t:
+            manager.write_chunks(ids, chunks, metadatas, embeddings)
+        total += t["seconds"]
+    return {"chunks": len(chunks) * args.repeat, "seconds": round(total, 4),
+            "chunks_per_sec": rate(len(chunks) * args.repeat, total)}
+
+
+def bench_ingest(ctx, args):
+    # Full add_documents path (chunk, embed, write, manifest) into the collection the assistant queries
+    manager = ctx["manager"]
+    with timer() as t:
+        written = manager.add_documents(ctx["docs"])
+    return {"pages": len(ctx["docs"]), "chunks": written, "seconds": round(t["seconds"], 4),
+            "chunks_per_sec": rate(written, t["seconds"])}
+
+
+def bench_search(ctx, args):
+    manager = ctx["manager"]
+    queries = ctx["queries"]
+    results = {}
+    # The first pass encodes every query; later passes hit the query embedding cache
+    for label, rounds in (("cold", 1), ("warm", args.repeat)):
+        latencies = []
+        for _ in range(rounds):
+            for query in queries:
+                start = time.perf_counter()
+                manager.search_similar(query, n_results=5)
+                latencies.append(time.perf_counter() - start)
+        results[label] = {"queries": len(latencies), **percentiles(latencies),
+                          "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2)}
+    return results
+
+
+def bench_respond(ctx, args):
+    from src.llm import StubBackend
+    from src.rag import SmartAPIAssistant
+    assistant = SmartAPIAssistant(llm=StubBackend(latency=args.llm_latency))
+    latencies = []
+    for _ in range(args.repeat):
+        for query in ctx["queries"]:
+            # Measure the full path, not semantic answer cache hits
+            assistant.answer_cache.clear()
+            start = time.perf_counter()
+            assistant.search_and_respond(query)
+            latencies.append(time.perf_counter() - start)
+    return {"queries": len(latencies), "llm_latency_ms": args.llm_latency * 1000, **percentiles(latencies),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance: float) -> int:
+    """Print per-metric changes; returns the number of regressions beyond ``tolerance``."""
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    regressions = 0
+    print(f"\nComparison with {baseline['meta'].get('commit', '?')} (tolerance {tolerance:.0%}):")
+    for name in sorted(set(now) & set(before)):
+        higher_better = name.endswith("_per_sec")
+        lower_better = name.endswith("_ms") and not name.endswith("llm_latency_ms")
+        if not (higher_better or lower_better) or not before[name]:
+            continue
+        change = (now[name] - before[name]) / before[name]
+        worse = -change if higher_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif worse < -tolerance:
+            flag = "  improved"
+        print(f"  {name:40s} {before[name]:>12.2f} -> {now[name]:>12.2f} ({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per stage")
+    parser.add_argument("--only", help=f"comma-separated stages to run (default: all of {','.join(STAGES)})")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="stub LLM seconds per answer")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(STAGES)
+    unknown = set(selected) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    needed = set()
+
+    def require(stage):
+        needed.add(stage)
+        for dependency in REQUIRES.get(stage, ()):
+            require(dependency)
+
+    for stage in selected:
+        require(stage)
+
+    from src.embeddings import EmbeddingsManager
+    from src.utils import EMBEDDING_MODEL
+    pages = fixture_pages()
+    ctx = {"pages": pages, "bytes": sum(len(html.encode("utf-8")) for html in pages.values()),
+           "queries": fixture_queries(), "manager": EmbeddingsManager()}
+
+    results = {}
+    for stage in STAGES:
+        if stage not in needed:
+            continue
+        print(f"running {stage}...", file=sys.stderr)
+        output = globals()[f"bench_{stage}"](ctx, args)
+        if stage in selected:
+            results[stage] = output
+
+    report = {
+        "meta": {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count(), "embedding_model": EMBEDDING_MODEL, "repeat": args.repeat,
+                 "fixture_pages": len(pages)},
+        "results": results
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(report, json.load(f), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,25 @@
 __version__ = "1.0.0"
 
-from .scraper import APIDocsScraper
-from .embeddings import EmbeddingsManager
-from .rag import SmartAPIAssistant
-from .utils import API_DOCS_URLS
+import importlib
+from typing import Any, List
 
-__all__ = ["APIDocsScraper", "EmbeddingsManager", "SmartAPIAssistant", "API_DOCS_URLS"]
\ No newline at end of file
+# Public name -> submodule. Imported on first access (PEP 562), so ``from src.utils import ...``
+# or ``import src`` doesn't pull in chromadb, sentence-transformers or groq before they're needed
+_LAZY = {
+    "APIDocsScraper": "scraper",
+    "EmbeddingsManager": "embeddings",
+    "SmartAPIAssistant": "rag",
+    "API_DOCS_URLS": "utils",
+}
+
+__all__ = ["APIDocsScraper", "EmbeddingsManager", "SmartAPIAssistant", "API_DOCS_URLS"]
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
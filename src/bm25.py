@@ -0,0 +1,113 @@
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .utils import atomic_write_json, read_json
+
+# Identifiers such as /v1/messages, x-api-key, max_tokens or repos.get stay whole
+_TOKEN_RE = re.compile(r"[a-z0-9_]+(?:[./\-:{}][a-z0-9_{}]+)*")
+_PART_RE = re.compile(r"[./\-:{}_]+")
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        # Also index the parts, so "tokens" finds max_tokens and "messages" finds /v1/messages
+        parts = [p for p in _PART_RE.split(token) if p]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[str]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+class BM25Index:
+    """Incrementally updated inverted index with Okapi BM25 scoring, persisted as JSON."""
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_meta: Dict[str, Dict[str, Any]] = {}
+        self.total_len = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        with self._lock:
+            for doc_id, text, meta in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                counts = Counter(tokenize(text))
+                for term, tf in counts.items():
+                    self.postings.setdefault(term, {})[doc_id] = tf
+                length = sum(counts.values())
+                self.doc_len[doc_id] = length
+                self.doc_meta[doc_id] = {"source": meta.get("source", ""), "terms": list(counts)}
+                self.total_len += length
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self.postings, self.doc_len, self.doc_meta, self.total_len = {}, {}, {}, 0
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self.doc_len: return
+        for term in self.doc_meta[doc_id]["terms"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting: del self.postings[term]
+        self.total_len -= self.doc_len.pop(doc_id)
+        del self.doc_meta[doc_id]
+
+    def search(self, query: str, k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            n = len(self.doc_len)
+            if not n: return []
+            avg_len = self.total_len / n
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting: continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            if where:
+                scores = {d: s for d, s in scores.items()
+                          if all(self.doc_meta[d].get(key) == value for key, value in where.items())}
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def _load(self):
+        if not self.path: return
+        data = read_json(self.path, "BM25 index")
+        if data is None: return
+        self.postings = data.get("postings", {})
+        self.doc_len = data.get("doc_len", {})
+        self.doc_meta = data.get("doc_meta", {})
+        self.total_len = sum(self.doc_len.values())
+
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            data = json.dumps({"postings": self.postings, "doc_len": self.doc_len, "doc_meta": self.doc_meta})
+        with self._save_lock:
+            atomic_write_json(self.path, data)
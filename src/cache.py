@@ -0,0 +1,191 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .utils import (logger, atomic_write, atomic_write_json, content_hash, read_json, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL, ANSWER_CACHE_SIZE,
+                    QUERY_CACHE_SIZE)
+
+def normalize(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+class SemanticAnswerCache:
+    """LRU cache of answers, looked up by cosine similarity of the query embedding.
+    
+    Entries are tied to a collection version; a lookup with a different
+    version drops everything, since the answers may cite stale documentation.
+    """
+    
+    def __init__(self, path: Optional[str] = None, threshold: float = ANSWER_CACHE_THRESHOLD,
+                 ttl: float = ANSWER_CACHE_TTL, max_entries: int = ANSWER_CACHE_SIZE):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = ""
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._load()
+    
+    def lookup(self, embedding, version: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        query = normalize(embedding)
+        with self._lock:
+            self._sync_version(version)
+            self._expire()
+            keys = [k for k, e in self._entries.items() if e["scope"] == scope]
+            if keys:
+                matrix = np.stack([self._entries[k]["embedding"] for k in keys])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return copy.deepcopy(self._entries[keys[best]]["result"])
+            self.misses += 1
+            return None
+    
+    def store(self, embedding, result: Dict[str, Any], version: str, scope: str = ""):
+        vec = normalize(embedding)
+        key = content_hash(f"{scope}:{np.round(vec, 4).tobytes().hex()}")
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = {
+                "embedding": vec,
+                "scope": scope,
+                "result": copy.deepcopy(result),
+                "created": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._save()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._save()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": len(self._entries)
+            }
+    
+    def _sync_version(self, version: str):
+        if version != self.version:
+            if self._entries:
+                logger.info("Collection changed; invalidating answer cache")
+            self._entries.clear()
+            self.version = version
+    
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for key in [k for k, e in self._entries.items() if e["created"] < cutoff]:
+            del self._entries[key]
+    
+    def _load(self):
+        if not self.path: return
+        data = read_json(self.path, "answer cache")
+        if data is None: return
+        self.version = data.get("version", "")
+        for key, entry in data.get("entries", []):
+            entry["embedding"] = np.asarray(entry["embedding"], dtype=np.float32)
+            self._entries[key] = entry
+    
+    def _save(self):
+        if not self.path: return
+        with self._lock:
+            entries: List = [(k, dict(e, embedding=e["embedding"].round(5).tolist()))
+                             for k, e in self._entries.items()]
+            data = json.dumps({"version": self.version, "entries": entries})
+        try:
+            with self._save_lock:
+                atomic_write_json(self.path, data)
+        except OSError as e:
+            logger.warning(f"Could not persist answer cache: {e}")
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe LRU of query embeddings keyed by (model name, normalized query).
+    
+    With a path, entries are loaded at start-up and written back as an .npz
+    file every ``save_every`` new entries.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_entries: int = QUERY_CACHE_SIZE, save_every: int = 32):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._load()
+    
+    def get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+    
+    def put(self, key: Tuple[str, str], embedding):
+        with self._lock:
+            self._entries[key] = np.asarray(embedding, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_every
+        if due:
+            self.save()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+    
+    def _load(self):
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with np.load(self.path) as data:
+                for model, query, embedding in zip(data["models"], data["queries"], data["embeddings"]):
+                    self._entries[(str(model), str(query))] = embedding
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable query cache {self.path}: {e}")
+    
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            if not self._entries: return
+            keys = list(self._entries)
+            embeddings = np.stack(list(self._entries.values()))
+            self._unsaved = 0
+        try:
+            with self._save_lock, atomic_write(self.path, 'wb') as f:
+                np.savez(f, models=np.array([k[0] for k in keys]), queries=np.array([k[1] for k in keys]),
+                         embeddings=embeddings)
+        except OSError as e:
+            logger.warning(f"Could not persist query cache: {e}")
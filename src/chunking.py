@@ -0,0 +1,138 @@
+import re
+from typing import List, Optional, Tuple
+from .utils import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, CODE_FENCE, WORD_RE
+
+# Bump whenever chunk boundaries change, so existing pages are re-chunked on the next ingest
+CHUNKER_VERSION = "tokens-2"
+
+# A one-line Markdown heading; a "#" code comment or shell prompt outside a fence is just text
+_HEADING_RE = re.compile(r"#{1,6}\s")
+
+class TokenChunker:
+    """Packs page blocks into chunks that fit the embedding model's sequence length.
+
+    Text is split into blocks on blank lines; a one-line Markdown heading
+    starts a new chunk once the current one is half full, and fenced code
+    blocks are kept whole. Every block is
+    tokenized exactly once, and blocks are packed greedily, so a page is
+    chunked in one linear pass. Only a block that alone exceeds the budget is
+    cut, at the last sentence (or, for code, line) boundary in the window.
+    """
+
+    def __init__(self, tokenizer=None, max_tokens: int = 256, overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+        self.tokenizer = tokenizer if getattr(tokenizer, 'is_fast', False) else None
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    @classmethod
+    def for_model(cls, model) -> "TokenChunker":
+        # Leave room for the [CLS]/[SEP] special tokens the encoder adds
+        limit = (getattr(model, 'max_seq_length', None) or 256) - 2
+        return cls(getattr(model, 'tokenizer', None), min(limit, CHUNK_MAX_TOKENS or limit))
+
+    def chunk(self, text: str, prefix: str = "") -> List[str]:
+        """Split ``text`` into chunks that fit alongside ``prefix`` (e.g. the page title)."""
+        return [chunk for chunk, _ in self.chunk_with_headings(text, prefix)]
+
+    def chunk_with_headings(self, text: str, prefix: str = "") -> List[Tuple[str, str]]:
+        """Like chunk, but pairs each chunk with the heading path ("A > B") it starts under."""
+        blocks = self._split_blocks(text)
+        if not blocks: return []
+        budget = max(16, self.max_tokens - self.count(prefix))
+        spans = self._token_spans([b for b, _ in blocks])
+
+        chunks: List[Tuple[str, str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        only_headings = True
+        path: List[Tuple[int, str]] = []
+        chunk_heading = ""
+
+        def flush():
+            nonlocal current, current_tokens, only_headings
+            if current:
+                chunks.append(("\n\n".join(current), chunk_heading))
+            current, current_tokens, only_headings = [], 0, True
+
+        for (block, is_heading), block_spans in zip(blocks, spans):
+            size = len(block_spans)
+            if is_heading:
+                level = len(block) - len(block.lstrip("#"))
+                while path and path[-1][0] >= level:
+                    path.pop()
+                path.append((level, block[level:].strip()))
+            # A heading closes a reasonably full chunk; short sections are merged instead
+            if is_heading and not only_headings and current_tokens >= budget // 2:
+                flush()
+            if size > budget:
+                # Oversized block: carry pending headings into its first piece, flush anything else
+                head = "\n\n".join(current) if only_headings else ""
+                head_tokens = current_tokens if head else 0
+                flush()
+                heading = " > ".join(title for _, title in path)
+                pieces = self._split_block(block, block_spans, budget - head_tokens)
+                pieces[0] = f"{head}\n\n{pieces[0]}" if head else pieces[0]
+                chunks.extend((piece, heading) for piece in pieces)
+                continue
+            if current and current_tokens + size > budget:
+                flush()
+            if not current:
+                chunk_heading = " > ".join(title for _, title in path)
+            current.append(block)
+            current_tokens += size
+            only_headings = only_headings and is_heading
+        flush()
+        return chunks
+
+    def count(self, text: str) -> int:
+        if not text: return 0
+        return len(self._token_spans([text])[0])
+
+    def _split_blocks(self, text: str) -> List[Tuple[str, bool]]:
+        blocks: List[Tuple[str, bool]] = []
+        code: Optional[List[str]] = None
+        for part in text.split("\n\n"):
+            if code is not None:
+                # Inside a fence: blank lines belong to the code block
+                code.append(part)
+                if part.rstrip().endswith(CODE_FENCE):
+                    blocks.append(("\n\n".join(code), False))
+                    code = None
+                continue
+            part = part.strip()
+            if not part: continue
+            if part.startswith(CODE_FENCE) and (part.count(CODE_FENCE) % 2 == 1):
+                code = [part]
+                continue
+            blocks.append((part, "\n" not in part and bool(_HEADING_RE.match(part))))
+        if code is not None:
+            blocks.append(("\n\n".join(code), False))
+        return blocks
+
+    def _token_spans(self, texts: List[str]) -> List[List[Tuple[int, int]]]:
+        if self.tokenizer is None:
+            return [[m.span() for m in WORD_RE.finditer(t)] for t in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [list(map(tuple, offsets)) for offsets in encoded['offset_mapping']]
+
+    def _split_block(self, block: str, spans: List[Tuple[int, int]], budget: int) -> List[str]:
+        budget = max(16, budget)
+        is_code = block.startswith(CODE_FENCE)
+        boundary = "\n" if is_code else "."
+        pieces = []
+        start = 0
+        while start < len(spans):
+            end = min(start + budget, len(spans))
+            if end < len(spans):
+                # Prefer the last boundary in the second half of the window
+                for i in range(end - 1, start + budget // 2, -1):
+                    a, b = spans[i]
+                    if block[a:b] == boundary or (is_code and "\n" in block[b:spans[i + 1][0]]):
+                        end = i + 1
+                        break
+            piece_end = spans[end - 1][1] if end < len(spans) else len(block)
+            piece = block[spans[start][0]:piece_end].strip()
+            if piece: pieces.append(piece)
+            if end >= len(spans): break
+            start = max(end - min(self.overlap_tokens, budget // 4), start + 1)
+        return pieces or [block]
@@ -0,0 +1,114 @@
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional
+from .utils import LLM_CONTEXT_WINDOW, LLM_MAX_TOKENS, LLM_HISTORY_TOKENS, CODE_FENCE, WORD_RE
+
+# Places a passage may be cut: after a sentence, or at a line end (which covers code)
+_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n")
+# Chat formatting overhead per message (role markers, separators)
+_MESSAGE_OVERHEAD = 4
+# A trimmed passage shorter than this isn't worth the header it comes with
+_MIN_PASSAGE_TOKENS = 48
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate for the chat model, whose tokenizer isn't available locally."""
+    if not text: return 0
+    return max(len(WORD_RE.findall(text)), math.ceil(len(text) / 4))
+
+def trim_to_tokens(text: str, budget: int, count: Callable[[str], int] = estimate_tokens) -> str:
+    """The longest prefix of ``text`` within ``budget`` tokens that ends at a sentence or line boundary.
+
+    A cut inside a fenced code block closes the fence. Returns "" if not even
+    the first sentence or line fits.
+    """
+    if count(text) <= budget: return text
+    cuts = [m.start() for m in _BOUNDARY_RE.finditer(text)]
+
+    def fits(end: int) -> bool:
+        return count(_close_fence(text[:end].rstrip())) <= budget
+
+    # Token counts grow with the prefix, so the last boundary that fits can be bisected
+    lo, hi, best = 0, len(cuts) - 1, -1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if fits(cuts[mid]):
+            best, lo = mid, mid + 1
+        else:
+            hi = mid - 1
+    return _close_fence(text[:cuts[best]].rstrip()) if best >= 0 else ""
+
+def _close_fence(text: str) -> str:
+    return f"{text}\n{CODE_FENCE}" if text.count(CODE_FENCE) % 2 else text
+
+class ContextPacker:
+    """Splits the model's context window between system prompt, history, documentation and answer.
+
+    The answer's ``max_tokens`` and the prompt are reserved first; recent
+    history is kept whole, newest first, up to ``history_tokens``; retrieved
+    passages then fill what is left in relevance order, and a passage that
+    doesn't fit whole is trimmed at a sentence or code-line boundary.
+    """
+
+    def __init__(self, context_window: int = LLM_CONTEXT_WINDOW, answer_tokens: int = LLM_MAX_TOKENS,
+                 history_tokens: int = LLM_HISTORY_TOKENS, count: Callable[[str], int] = estimate_tokens):
+        self.context_window = context_window
+        self.answer_tokens = answer_tokens
+        self.history_tokens = history_tokens
+        self.count = count
+
+    def pack(self, system_prompt: str, question: str, docs: List[Dict[str, Any]],
+             history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Pack one request.
+
+        ``question`` is the user message without its documentation, so its cost
+        is known up front. Returns the ``history`` messages to send, the
+        documentation ``context`` block, the ``docs`` it draws on and a
+        ``budget`` report of token use.
+        """
+        fixed = self.count(system_prompt) + self.count(question) + 2 * _MESSAGE_OVERHEAD
+        available = self.context_window - self.answer_tokens - fixed
+
+        kept: List[Dict[str, str]] = []
+        history_used = 0
+        for message in reversed(history or []):
+            cost = self.count(message.get("content", "")) + _MESSAGE_OVERHEAD
+            if history_used + cost > min(self.history_tokens, available):
+                break
+            kept.insert(0, message)
+            history_used += cost
+        available -= history_used
+
+        passages = []
+        used_docs = []
+        trimmed = 0
+        for doc in docs:
+            meta = doc.get('metadata', {})
+            header = f"Source {len(passages) + 1} ({meta.get('source', 'Unknown')}):\nURL: {meta.get('url', '')}\nContent: "
+            room = available - self.count(header) - 1
+            if room < _MIN_PASSAGE_TOKENS:
+                break
+            content = doc.get('content', '')
+            text = trim_to_tokens(content, room, self.count)
+            if not text:
+                continue
+            trimmed += text != content
+            passage = f"{header}{text}\n"
+            passages.append(passage)
+            available -= self.count(passage) + 1
+            used_docs.append(doc)
+
+        context = "\n".join(passages) if passages else "No relevant documentation found."
+        docs_tokens = self.count(context)
+        report = {
+            "context_window": self.context_window,
+            "answer_reserved": self.answer_tokens,
+            "prompt": fixed,
+            "history": history_used,
+            "history_messages": len(kept),
+            "docs": docs_tokens,
+            "docs_used": len(used_docs),
+            "docs_trimmed": trimmed,
+            "docs_dropped": len(docs) - len(used_docs),
+            "used": fixed + history_used + docs_tokens + self.answer_tokens
+        }
+        return {"history": kept, "context": context, "docs": used_docs, "budget": report}
@@ -1,96 +1,430 @@
-# SQLite compatibility fix for Streamlit Cloud
-import sys
-__import__('pysqlite3')
-sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+from typing import List, Dict, Any, Optional
+import os
+import numpy as np
+from . import resources
+from .bm25 import reciprocal_rank_fusion
+from .chunking import TokenChunker, CHUNKER_VERSION
+from .metrics import METRICS
+from .scraper import EXTRACTOR_VERSION
+from .vectorstore import NUMPY_INDEX
+from .utils import (logger, content_hash, CHROMA_DB_PATH, EMBEDDING_MODEL, EMBED_BATCH_SIZE,
+                    EMBED_WORKERS, EMBED_MP_MIN_TEXTS, HYBRID_SEARCH, RRF_K, RERANK, RERANK_MODEL,
+                    CHROMA_SPACE, HNSW_M, HNSW_CONSTRUCTION_EF, HNSW_SEARCH_EF, SEARCH_OVERFETCH, MIN_SIMILARITY,
+                    VECTOR_STORE)
 
-import chromadb
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
-import uuid
-from .utils import logger, chunk_text
+# Everything that shapes stored chunks; a change means pages must be re-chunked
+INGEST_VERSION = f"{EXTRACTOR_VERSION}/{CHUNKER_VERSION}"
+
+# What Chroma builds when no index settings are given (collections from before they were configurable)
+CHROMA_INDEX_DEFAULTS = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 100}
+# Settings baked into the built graph; changing any of them means re-indexing every vector
+_REBUILD_KEYS = ("space", "M", "construction_ef")
+_MIGRATION_SUFFIX = "_migrating"
+VECTOR_STORES = ("chroma", "numpy")
+
+def chunk_id(url: str, index: int, chunk_hash: str) -> str:
+    return content_hash(f"{url}#{index}:{chunk_hash}")
+
+def state_path(persist_path: str, collection_name: str, store: str, kind: str) -> str:
+    # Each store keeps its own manifest and BM25 index, so switching VECTOR_STORE never pairs
+    # one store's contents with the other's ingest records
+    prefix = collection_name if store == "chroma" else f"{collection_name}_{store}"
+    return os.path.join(persist_path, f"{prefix}_{kind}")
+
+def index_settings(space: str = CHROMA_SPACE, m: int = HNSW_M, construction_ef: int = HNSW_CONSTRUCTION_EF,
+                   search_ef: int = HNSW_SEARCH_EF) -> Dict[str, Any]:
+    if space not in ("cosine", "l2", "ip"):
+        raise ValueError(f"Unknown distance space {space!r}; expected cosine, l2 or ip")
+    return {"space": space, "M": m, "construction_ef": construction_ef, "search_ef": search_ef}
+
+def hnsw_metadata(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Collection metadata that makes Chroma build its index with ``settings``."""
+    return {f"hnsw:{key}": value for key, value in settings.items()}
+
+def collection_index_settings(collection) -> Dict[str, Any]:
+    """Distance space and HNSW parameters an existing collection's index uses."""
+    config = getattr(collection, "configuration", None)
+    hnsw = config.get("hnsw") if isinstance(config, dict) else None
+    if hnsw:
+        # chromadb >= 1.0 reports the effective values, including ones changed after creation
+        return {"space": hnsw["space"], "M": hnsw["max_neighbors"], "construction_ef": hnsw["ef_construction"],
+                "search_ef": hnsw["ef_search"]}
+    metadata = collection.metadata or {}
+    return {key: metadata.get(f"hnsw:{key}", default) for key, default in CHROMA_INDEX_DEFAULTS.items()}
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """Cosine similarity from a Chroma distance; exact in the l2 and ip spaces only for normalized embeddings."""
+    if space == "l2":
+        # Chroma's l2 is the squared distance, which is 2 - 2cos between unit vectors
+        return 1 - distance / 2
+    return 1 - distance
+
+def corpus_is_current(urls: List[str], collection_name: str = "api_docs", persist_path: str = CHROMA_DB_PATH,
+                      model_name: str = EMBEDDING_MODEL, store: str = VECTOR_STORE) -> bool:
+    """Whether the persisted collection already holds these URLs, embedded by this model and ingest version.
+    
+    Reads only the store's count and the manifest, so it is cheap enough to
+    run at startup without loading the embedding model.
+    """
+    manifest = resources.get_manifest(state_path(persist_path, collection_name, store, "manifest.json"))
+    corpus = manifest.corpus
+    if (corpus.get('model_name') != model_name or corpus.get('ingest_version') != INGEST_VERSION
+            or set(corpus.get('urls', ())) != set(urls)):
+        return False
+    try:
+        if store == "numpy":
+            return resources.get_numpy_store(state_path(persist_path, collection_name, store, "vectors"),
+                                             collection_name).count() > 0
+        return resources.get_chroma_client(persist_path).get_collection(collection_name).count() > 0
+    except Exception:
+        return False
 
 class EmbeddingsManager:
-    def __init__(self, collection_name: str = "api_docs"):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.client = chromadb.PersistentClient(path="./chroma_db")
+    def __init__(self, collection_name: str = "api_docs", persist_path: str = CHROMA_DB_PATH,
+                 model_name: str = EMBEDDING_MODEL, workers: int = EMBED_WORKERS, store: str = VECTOR_STORE):
+        if store not in VECTOR_STORES:
+            raise ValueError(f"Unknown vector store {store!r}; expected one of {', '.join(VECTOR_STORES)}")
+        # Model, client, store and manifest are process-wide; constructing a manager is cheap
+        self.model_name = model_name
+        self.store = store
+        self.workers = max(1, workers)
+        self.persist_path = persist_path
+        self.model = resources.get_embedding_model(model_name)
+        self.chunker = TokenChunker.for_model(self.model)
+        self.ingest_version = INGEST_VERSION
+        self._encode_lock = resources.get_lock(f"encode:{model_name}")
+        self.query_cache = resources.get_query_cache(persist_path)
+        # Uncased models embed "Foo" and "foo" identically, so they can share a cache entry
+        self._lowercase_queries = getattr(getattr(self.model, 'tokenizer', None), 'do_lower_case', False)
+        self.client = resources.get_chroma_client(persist_path) if store == "chroma" else None
         self.collection = self._get_collection(collection_name)
+        self.manifest = resources.get_manifest(state_path(persist_path, collection_name, store, "manifest.json"))
+        self.lexical_index = resources.get_bm25_index(state_path(persist_path, collection_name, store, "bm25.json"))
+        # Held across each collection write and its BM25 update, so the two are never seen out of step
+        self._write_lock = resources.get_lock(f"write:{persist_path}:{collection_name}:{store}")
+        self.hybrid = HYBRID_SEARCH
+        self.reranker = resources.get_reranker(RERANK_MODEL) if RERANK else None
+        
+        with self._write_lock:
+            count = self.get_collection_stats()["total_documents"]
+            # A wiped collection must not be trusted to match a leftover manifest
+            if self.manifest.pages and not count:
+                self.manifest.clear()
+                self.lexical_index.clear()
+            elif count and len(self.lexical_index) != count:
+                self._rebuild_lexical_index()
+        self._expire_outdated_pages()
         logger.info(f"Initialized embeddings with {collection_name}")
     
+    def _expire_outdated_pages(self):
+        # Pages ingested by an older extractor or chunker must be fetched in full, not answered with a 304
+        for url, page in list(self.manifest.pages.items()):
+            if page.get('ingest_version') != self.ingest_version and (page.get('etag') or page.get('last_modified')):
+                self.manifest.update(url, etag='', last_modified='')
+    
+    def _rebuild_lexical_index(self, page_size: int = 1000):
+        logger.info("Rebuilding BM25 index from the collection")
+        self.lexical_index.clear()
+        for offset in range(0, self.collection.count(), page_size):
+            batch = self.collection.get(include=['documents', 'metadatas'], limit=page_size, offset=offset)
+            self.lexical_index.add(batch['ids'], batch['documents'], batch['metadatas'])
+        self.lexical_index.save()
+    
     def _get_collection(self, name: str):
+        if self.store == "numpy":
+            self.index = dict(NUMPY_INDEX)
+            return resources.get_numpy_store(state_path(self.persist_path, name, self.store, "vectors"), name)
+        wanted = index_settings()
+        with resources.get_lock(f"collection:{self.persist_path}:{name}"):
+            self._recover_migration(name)
+            # get_or_create avoids a create race when sessions share the client; an existing
+            # collection keeps the settings it was built with, so those are checked below
+            collection = self.client.get_or_create_collection(name, metadata=hnsw_metadata(wanted))
+            current = collection_index_settings(collection)
+            if any(current[key] != wanted[key] for key in _REBUILD_KEYS):
+                collection = self._migrate_collection(collection, wanted)
+            elif current["search_ef"] != wanted["search_ef"]:
+                collection = self._set_search_ef(collection, wanted)
+        self.index = collection_index_settings(collection)
+        return collection
+    
+    def _set_search_ef(self, collection, wanted: Dict[str, Any]):
         try:
-            return self.client.get_collection(name)
-        except:
-            return self.client.create_collection(name)
+            # Query-time only, so chromadb >= 1.0 can change it without touching the graph. It applies to
+            # indexes loaded after the change, which holds here: this runs before the process queries
+            collection.modify(configuration={"hnsw": {"ef_search": wanted["search_ef"]}})
+            return self.client.get_collection(collection.name)
+        except Exception as e:
+            logger.info(f"search_ef can't be changed in place ({e}); rebuilding instead")
+            return self._migrate_collection(collection, wanted)
+    
+    def _migrate_collection(self, old, wanted: Dict[str, Any], page_size: int = 1000):
+        """Copy every vector into a collection built with ``wanted``, then swap it in under the old name.
+        
+        Stored embeddings are reused, so nothing is re-encoded.
+        """
+        name = old.name
+        logger.info(f"Rebuilding collection {name}: index {collection_index_settings(old)} -> {wanted}")
+        metadata = {key: value for key, value in (old.metadata or {}).items() if not key.startswith("hnsw:")}
+        staging = self.client.create_collection(name + _MIGRATION_SUFFIX, metadata={**metadata, **hnsw_metadata(wanted)})
+        for offset in range(0, old.count(), page_size):
+            batch = old.get(include=['documents', 'metadatas', 'embeddings'], limit=page_size, offset=offset)
+            staging.add(ids=batch['ids'], documents=batch['documents'], metadatas=batch['metadatas'],
+                        embeddings=batch['embeddings'])
+        # From here on a crash leaves only the complete copy, which _recover_migration renames
+        self.client.delete_collection(name)
+        staging.modify(name=name)
+        logger.info(f"Rebuilt collection {name} with {staging.count()} chunks")
+        return self.client.get_collection(name)
+    
+    def _recover_migration(self, name: str):
+        """Finish or discard a rebuild that was interrupted."""
+        try:
+            staging = self.client.get_collection(name + _MIGRATION_SUFFIX)
+        except Exception:
+            return
+        try:
+            self.client.get_collection(name)
+        except Exception:
+            # The original had already been dropped, so the copy is complete
+            staging.modify(name=name)
+            return
+        self.client.delete_collection(name + _MIGRATION_SUFFIX)
+    
+    @property
+    def uses_encode_pool(self) -> bool:
+        # The ONNX backend has no process pool; ONNX Runtime already spreads a batch over CPU threads
+        return self.workers > 1 and hasattr(self.model, 'start_multi_process_pool')
+    
+    @property
+    def encode_batch_size(self) -> int:
+        """Chunks per create_embeddings call during ingest.
+        
+        With an encode pool, batches must reach EMBED_MP_MIN_TEXTS or they would
+        never be sharded across the worker processes.
+        """
+        return max(EMBED_BATCH_SIZE, EMBED_MP_MIN_TEXTS) if self.uses_encode_pool else EMBED_BATCH_SIZE
     
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return self.model.encode(texts).tolist()
+        # Fast tokenizers are not safe to call from several threads at once, and the
+        # process pool's shared queues would interleave results of concurrent calls
+        with self._encode_lock:
+            if self.uses_encode_pool and len(texts) >= EMBED_MP_MIN_TEXTS:
+                pool = resources.get_encode_pool(self.model_name, self.workers)
+                return self.model.encode(texts, pool=pool, show_progress_bar=False).tolist()
+            return self.model.encode(texts, show_progress_bar=False).tolist()
     
     def add_documents(self, docs: List[Dict[str, Any]]) -> int:
-        documents, metadatas, ids = [], [], []
-        
-        for doc in docs:
-            if 'error' in doc: continue
-            
-            chunks = chunk_text(doc.get('content', ''), 800, 100)
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip(): continue
-                
-                documents.append(f"Title: {doc.get('title', '')}\n\nContent: {chunk}")
-                metadatas.append({
-                    "source": doc.get('source', 'Unknown'),
-                    "url": doc.get('url', ''),
-                    "title": doc.get('title', ''),
-                    "chunk_index": i
-                })
-                ids.append(str(uuid.uuid4()))
+        """Embed and upsert only the chunks that changed since the last ingest.
         
-        if not documents: return 0
+        Chunk IDs are derived from URL, chunk index and chunk hash, so a page
+        whose content is unchanged produces the same IDs and is skipped.
+        Returns the number of chunks embedded.
+        """
+        plans = [plan for doc in docs if (plan := self.plan_page(doc))]
+        documents = [text for plan in plans for text in plan["documents"]]
+        metadatas = [meta for plan in plans for meta in plan["metadatas"]]
+        ids = [cid for plan in plans for cid in plan["ids"]]
         
         # Process in batches
-        batch_size = 50
+        batch_size = self.encode_batch_size
         total = 0
         for i in range(0, len(documents), batch_size):
             batch_docs = documents[i:i + batch_size]
-            batch_meta = metadatas[i:i + batch_size]
-            batch_ids = ids[i:i + batch_size]
-            
             embeddings = self.create_embeddings(batch_docs)
-            self.collection.add(
-                documents=batch_docs,
-                embeddings=embeddings,
-                metadatas=batch_meta,
-                ids=batch_ids
-            )
-            total += len(batch_docs)
+            total += self.write_chunks(ids[i:i + batch_size], batch_docs, metadatas[i:i + batch_size], embeddings)
+        
+        for plan in plans:
+            self.finish_page(plan)
+        self.save_state()
         
+        logger.info(f"Ingest: {total} chunks embedded, {len(docs) - len(plans)} pages unchanged or failed")
         return total
     
-    def search_similar(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def plan_page(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Chunk a scraped page and work out which chunks need embedding.
+        
+        Returns None when there is nothing to do (error, 304 or identical
+        content); otherwise the new chunks, the stale chunk IDs to delete and
+        the manifest fields to record once the page has been written.
+        """
+        if 'error' in doc or doc.get('not_modified'): return None
+        
+        url = doc.get('url', '')
+        content = doc.get('content', '')
+        page_hash = doc.get('content_hash') or content_hash(content)
+        known = self.manifest.get(url)
+        validators = {"etag": doc.get('etag', ''), "last_modified": doc.get('last_modified', '')}
+        if known.get('content_hash') == page_hash and known.get('ingest_version') == self.ingest_version:
+            self.manifest.update(url, **validators)
+            return None
+        
+        plan = {"url": url, "documents": [], "metadatas": [], "ids": []}
+        known_ids = set(known.get('chunk_ids', ()))
+        page_ids = []
+        anchors = {s["heading"]: s["anchor"] for s in doc.get('sections', ()) if s["kind"] == "heading"}
+        prefix = f"Title: {doc.get('title', '')}\n\nContent: "
+        for i, (chunk, heading) in enumerate(self.chunker.chunk_with_headings(content, prefix)):
+            if not chunk.strip(): continue
+            
+            text = f"{prefix}{chunk}"
+            cid = chunk_id(url, i, content_hash(text))
+            page_ids.append(cid)
+            if cid in known_ids: continue
+            
+            plan["documents"].append(text)
+            plan["metadatas"].append({
+                "source": doc.get('source', 'Unknown'),
+                "url": url,
+                "title": doc.get('title', ''),
+                "section": heading,
+                "anchor": anchors.get(heading, ''),
+                "chunk_index": i
+            })
+            plan["ids"].append(cid)
+        
+        plan["stale_ids"] = list(known_ids - set(page_ids))
+        plan["manifest"] = dict(validators, content_hash=page_hash, chunk_ids=page_ids,
+                                ingest_version=self.ingest_version)
+        return plan
+    
+    def write_chunks(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+                     embeddings: List[List[float]]) -> int:
+        with self._write_lock:
+            self.collection.upsert(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+            self.lexical_index.add(ids, documents, metadatas)
+        return len(ids)
+    
+    def finish_page(self, plan: Dict[str, Any]):
+        # Only called after the page's new chunks are written, so a crash never leaves it half-deleted
+        if plan["stale_ids"]:
+            with self._write_lock:
+                self.collection.delete(ids=plan["stale_ids"])
+                self.lexical_index.remove(plan["stale_ids"])
+        self.manifest.update(plan["url"], **plan["manifest"])
+    
+    def record_corpus(self, urls: List[str]):
+        """Mark a completed ingest of ``urls`` so later startups can skip re-ingesting."""
+        self.manifest.set_corpus(model_name=self.model_name, ingest_version=self.ingest_version,
+                                 urls=sorted(set(urls)))
+    
+    def save_state(self):
+        if self.store == "numpy":
+            # Vectors first: a saved manifest must never list chunks the saved store lacks
+            self.collection.save()
+        self.manifest.save()
+        self.lexical_index.save()
+    
+    def clear(self, page_size: int = 1000):
+        """Drop every chunk, along with the BM25 index and manifest entries that describe them."""
+        with self._write_lock:
+            if self.store == "numpy":
+                self.collection.clear()
+            else:
+                # Deleted by ID rather than dropping the collection, which other sessions hold open
+                while self.collection.count():
+                    self.collection.delete(ids=self.collection.get(include=[], limit=page_size)['ids'])
+            self.lexical_index.clear()
+            self.manifest.clear()
+    
+    def export_snapshot(self, path: str, dtype: str = "float32") -> Dict[str, Any]:
+        """Write the collection to a portable snapshot file (see src.snapshot)."""
+        from .snapshot import export_snapshot
+        return export_snapshot(self, path, dtype)
+    
+    def load_snapshot(self, path: str) -> Dict[str, Any]:
+        """Replace the collection with a snapshot's chunks and embeddings, without re-embedding anything."""
+        from .snapshot import import_snapshot
+        return import_snapshot(self, path)
+    
+    def embed_query(self, query: str) -> List[float]:
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries, encoding all the ones not already cached in a single model call."""
+        texts = [" ".join(query.split()) for query in queries]
+        keys = [(self.model_name, text.lower() if self._lowercase_queries else text) for text in texts]
+        cached = [self.query_cache.get(key) for key in keys]
+        missing = {key: text for key, text, embedding in zip(keys, texts, cached) if embedding is None}
+        misses = sum(embedding is None for embedding in cached)
+        METRICS.inc("cache_hits", len(cached) - misses, cache="query_embedding")
+        METRICS.inc("cache_misses", misses, cache="query_embedding")
+        fresh = {}
+        if missing:
+            with METRICS.span("query_encode"):
+                fresh = dict(zip(missing, self.create_embeddings(list(missing.values()))))
+            for key, embedding in fresh.items():
+                self.query_cache.put(key, embedding)
+        return [fresh[key] if embedding is None else embedding.tolist() for key, embedding in zip(keys, cached)]
+    
+    def collection_version(self) -> str:
+        # Changes whenever ingest adds, replaces or removes content
+        return f"{self.manifest.fingerprint()}:{self.get_collection_stats()['total_documents']}"
+    
+    def search_similar(self, query: str, n_results: int = 5, query_embedding: Optional[List[float]] = None,
+                       source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieve the best chunk per URL, optionally restricted to one ``source``.
+        
+        A source filter that matches nothing falls back to searching everything.
+        """
+        if query_embedding is None:
+            try:
+                query_embedding = self.embed_query(query)
+            except Exception as e:
+                logger.error(f"Search error: {e}")
+                return []
+        if source:
+            results = self._search(query, n_results, query_embedding, {"source": source})
+            if results:
+                return results
+            logger.info(f"No {source} matches; searching all sources")
+        return self._search(query, n_results, query_embedding, None)
+    
+    def _search(self, query: str, n_results: int, query_embedding: List[float],
+                where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
         try:
-            query_embedding = self.create_embeddings([query])[0]
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results * 3,
-                include=['documents', 'metadatas', 'distances']
-            )
+            with METRICS.span("vector_query"):
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results * SEARCH_OVERFETCH,
+                    where=where,
+                    include=['documents', 'metadatas', 'distances']
+                )
+            
+            candidates = {}
+            if results['ids'] and results['ids'][0]:
+                for i, doc_id in enumerate(results['ids'][0]):
+                    candidates[doc_id] = {
+                        "content": results['documents'][0][i],
+                        "metadata": results['metadatas'][0][i],
+                        "similarity": distance_to_similarity(results['distances'][0][i], self.index["space"])
+                    }
+            ranked = list(candidates)
+            
+            if self.hybrid:
+                # Exact identifiers (paths, headers, parameters) are found lexically and fused by rank
+                with METRICS.span("lexical_search"):
+                    lexical = [doc_id for doc_id, _ in self.lexical_index.search(query, n_results * SEARCH_OVERFETCH, where)]
+                    ranked = reciprocal_rank_fusion([ranked, lexical], k=RRF_K)
+                    missing = [doc_id for doc_id in ranked if doc_id not in candidates]
+                    if missing:
+                        candidates.update(self._fetch_candidates(missing, query_embedding))
+            
+            # Filter out very poor matches
+            pool = [candidates[doc_id] for doc_id in ranked
+                    if doc_id in candidates and candidates[doc_id]["similarity"] >= MIN_SIMILARITY]
+            if self.reranker:
+                with METRICS.span("rerank"):
+                    pool = self.reranker.rerank(query, pool)
             
             formatted = []
             seen_urls = set()
-            if results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    similarity = 1 - results['distances'][0][i]
-                    # Filter out very poor matches (< 0.1 similarity)
-                    if similarity < 0.1:
-                        continue
-                        
-                    url = results['metadatas'][0][i].get('url', '')
+            with METRICS.span("dedup"):
+                for candidate in pool:
+                    url = candidate["metadata"].get('url', '')
                     if url not in seen_urls:
                         seen_urls.add(url)
-                        formatted.append({
-                            "content": results['documents'][0][i],
-                            "metadata": results['metadatas'][0][i],
-                            "similarity": similarity
-                        })
+                        formatted.append(candidate)
                         if len(formatted) >= n_results:
                             break
             return formatted
@@ -98,6 +432,20 @@ class EmbeddingsManager:
             logger.error(f"Search error: {e}")
             return []
     
+    def _fetch_candidates(self, ids: List[str], query_embedding: List[float]) -> Dict[str, Dict[str, Any]]:
+        found = self.collection.get(ids=ids, include=['documents', 'metadatas', 'embeddings'])
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        candidates = {}
+        for i, doc_id in enumerate(found['ids']):
+            embedding = np.asarray(found['embeddings'][i], dtype=np.float32)
+            candidates[doc_id] = {
+                "content": found['documents'][i],
+                "metadata": found['metadatas'][i],
+                "similarity": float(embedding @ query / (np.linalg.norm(embedding) or 1.0))
+            }
+        return candidates
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         try:
             return {"total_documents": self.collection.count()}
@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from .utils import logger, SCRAPER_DELAY
+
+class IngestJob:
+    """One documentation load running in a background thread.
+
+    The thread belongs to the process rather than a Streamlit script run, so
+    the work carries on across reruns and browser refreshes while any session
+    polls ``progress()``.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.urls = list(urls)
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.result: Dict[str, int] = {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._pipeline = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ingest-job", daemon=True)
+
+    def start(self) -> "IngestJob":
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def progress(self) -> Dict[str, Any]:
+        stats = self._pipeline.progress() if self._pipeline else {}
+        if self.result:
+            stats = dict(self.result)
+        end = self.finished_at or time.time()
+        return {"status": self.status, "error": self.error, "elapsed": end - self.started_at, **stats}
+
+    def _run(self):
+        try:
+            # Imported here so the job registry stays importable without loading models
+            from .embeddings import EmbeddingsManager
+            from .pipeline import IngestPipeline
+            from .scraper import APIDocsScraper
+
+            embeddings = EmbeddingsManager()
+            self._pipeline = IngestPipeline(APIDocsScraper(delay=SCRAPER_DELAY), embeddings)
+            self.status = "running"
+            result = self._pipeline.run(self.urls)
+            result["total_documents"] = embeddings.get_collection_stats()["total_documents"]
+            self.result = result
+            self.status = "done"
+        except Exception as e:
+            logger.error(f"Ingest job failed: {e}")
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+class IngestJobManager:
+    """Runs at most one ingest job per process; callers arriving mid-load join the running job."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._job: Optional[IngestJob] = None
+
+    def start(self, urls: List[str]) -> IngestJob:
+        with self._lock:
+            if self._job is not None and self._job.running:
+                logger.info("Joining the ingest job already in progress")
+                return self._job
+            self._job = IngestJob(urls).start()
+            return self._job
+
+    def current(self) -> Optional[IngestJob]:
+        return self._job
+
+    def active(self) -> Optional[IngestJob]:
+        job = self._job
+        return job if job is not None and job.running else None
+
+# Kept out of src.resources so checking for a running job doesn't import the model stack
+_manager: Optional[IngestJobManager] = None
+_manager_lock = threading.Lock()
+
+def get_ingest_jobs() -> IngestJobManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = IngestJobManager()
+        return _manager
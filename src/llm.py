@@ -0,0 +1,153 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from .utils import (logger, LLM_BACKEND, GROQ_MODEL, LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF,
+                    LLM_MAX_CONNECTIONS, LLM_STUB_LATENCY, LLM_STUB_TOKEN_LATENCY)
+
+Messages = List[Dict[str, str]]
+
+class LLMBackend:
+    """Chat completion interface the assistant talks to: blocking, streaming and async calls."""
+
+    name = "base"
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        raise NotImplementedError
+
+class GroqBackend(LLMBackend):
+    """Groq chat completions over pooled keep-alive connections, with timeouts and jittered retries.
+
+    Connection errors, timeouts, 429s and 5xx responses are retried up to
+    ``max_retries`` times with full-jitter exponential backoff; a stream is
+    only retried before its first token.
+    """
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = GROQ_MODEL, timeout: float = LLM_TIMEOUT,
+                 max_retries: int = LLM_MAX_RETRIES, backoff: float = LLM_RETRY_BACKOFF,
+                 max_connections: int = LLM_MAX_CONNECTIONS):
+        import groq
+        import httpx
+        self._groq = groq
+        self.model = model
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # Retries are ours (below), so the SDK's own are turned off
+        self.client = groq.Groq(api_key=api_key, timeout=timeout, max_retries=0,
+                                http_client=httpx.Client(limits=limits, timeout=timeout))
+        self._async_client = None
+        self._async_args = dict(api_key=api_key, timeout=timeout, limits=limits)
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        for attempt in self._attempts():
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+                return response.choices[0].message.content
+            except Exception as e:
+                self._retry_or_raise(e, attempt)
+                time.sleep(self._delay(attempt))
+
+    def stream(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> Iterator[str]:
+        for attempt in self._attempts():
+            started = False
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True)
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        started = True
+                        yield chunk.choices[0].delta.content
+                return
+            except Exception as e:
+                # Once tokens have been shown, a retry would repeat them
+                if started: raise
+                self._retry_or_raise(e, attempt)
+                time.sleep(self._delay(attempt))
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        client = self._get_async_client()
+        for attempt in self._attempts():
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+                return response.choices[0].message.content
+            except Exception as e:
+                self._retry_or_raise(e, attempt)
+                await asyncio.sleep(self._delay(attempt))
+
+    def _get_async_client(self):
+        # Created on first use, inside the event loop that will drive it
+        if self._async_client is None:
+            import httpx
+            args = self._async_args
+            self._async_client = self._groq.AsyncGroq(
+                api_key=args["api_key"], timeout=args["timeout"], max_retries=0,
+                http_client=httpx.AsyncClient(limits=args["limits"], timeout=args["timeout"]))
+        return self._async_client
+
+    def _attempts(self):
+        return range(self.max_retries + 1)
+
+    def _retry_or_raise(self, error: Exception, attempt: int):
+        groq = self._groq
+        retryable = isinstance(error, (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)) or (
+            isinstance(error, groq.APIStatusError) and error.status_code >= 500)
+        if not retryable or attempt >= self.max_retries:
+            raise error
+        logger.warning(f"Groq call failed ({error.__class__.__name__}); retry {attempt + 1}/{self.max_retries}")
+
+    def _delay(self, attempt: int) -> float:
+        # Full jitter: spreads out clients that failed together instead of retrying in lockstep
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+class StubBackend(LLMBackend):
+    """Deterministic offline backend: a canned answer after ``latency`` seconds, streamed word by word.
+
+    Lets the whole RAG pipeline be run and benchmarked without network access.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = LLM_STUB_LATENCY, token_latency: float = LLM_STUB_TOKEN_LATENCY):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def _answer(self, messages: Messages) -> str:
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        question = prompt.split("Question: ", 1)[-1].split("\n", 1)[0]
+        return f"Stub answer to \"{question}\" from {prompt.count('URL: ')} documentation sources."
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        time.sleep(self.latency)
+        return self._answer(messages)
+
+    def stream(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> Iterator[str]:
+        time.sleep(self.latency)
+        for word in self._answer(messages).split(" "):
+            time.sleep(self.token_latency)
+            yield f"{word} "
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        await asyncio.sleep(self.latency)
+        return self._answer(messages)
+
+BACKENDS = {"groq": GroqBackend, "stub": StubBackend}
+
+def create_backend(name: str = LLM_BACKEND, **kwargs: Any) -> LLMBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
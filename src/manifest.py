@@ -0,0 +1,51 @@
+import json
+import threading
+from typing import Dict, Any
+from .utils import atomic_write_json, content_hash, read_json
+
+class PageManifest:
+    """Per-URL record of what was last ingested: HTTP validators, content hash and chunk IDs.
+    
+    ``corpus`` describes the last completed ingest as a whole (embedding model,
+    ingest version and URL set), which is what a warm start is checked against.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.corpus: Dict[str, Any] = {}
+        self._load()
+    
+    def _load(self):
+        data = read_json(self.path, "manifest")
+        if data is None: return
+        self.pages = data.get('pages', {})
+        self.corpus = data.get('corpus', {})
+    
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.pages.get(url, {}))
+    
+    def update(self, url: str, **fields):
+        with self._lock:
+            self.pages.setdefault(url, {}).update(fields)
+    
+    def set_corpus(self, **fields):
+        with self._lock:
+            self.corpus = dict(fields)
+    
+    def fingerprint(self) -> str:
+        with self._lock:
+            hashes = {url: page.get('content_hash', '') for url, page in self.pages.items()}
+        return content_hash(json.dumps(hashes, sort_keys=True))
+    
+    def clear(self):
+        with self._lock:
+            self.pages = {}
+            self.corpus = {}
+    
+    def save(self):
+        with self._lock:
+            data = json.dumps({'pages': self.pages, 'corpus': self.corpus}, indent=2, sort_keys=True)
+        atomic_write_json(self.path, data)
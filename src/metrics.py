@@ -0,0 +1,137 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTERS = {
+    "queries": "Questions asked, including ones answered from cache",
+    "cache_hits": "Cache lookups that hit, by cache",
+    "cache_misses": "Cache lookups that missed, by cache",
+    "llm_tokens": "Estimated LLM tokens, by direction (in = prompt, out = answer)",
+    "failures": "Stage failures, including errors handled by returning an empty result",
+    "http_requests": "Requests to the headless service, by path and status"
+}
+
+class Trace:
+    """Stage timings for one request, in the order the stages finished."""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, stage: str, seconds: float, ok: bool = True):
+        self.spans.append({"stage": stage, "ms": round(seconds * 1000, 2), "ok": ok})
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("ragify_trace", default=None)
+
+class Metrics:
+    """Thread-safe latency histograms per stage and labelled counters, rendered as Prometheus text.
+
+    ``span(stage)`` times a block into the stage histogram and into the
+    request's ``Trace`` when one is active, and counts a failure when the
+    block raises, even if a caller further up swallows the error.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        # stage -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[str, List[float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage: str, seconds: float, ok: bool = True, trace: Optional[Trace] = None):
+        with self._lock:
+            histogram = self._histograms.setdefault(stage, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += seconds
+        if not ok:
+            self.inc("failures", stage=stage)
+        trace = trace or _current_trace.get()
+        if trace is not None:
+            trace.add(stage, seconds, ok)
+
+    @contextmanager
+    def span(self, stage: str, trace: Optional[Trace] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        except GeneratorExit:
+            # A stream the caller stopped reading early did not fail
+            ok = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, ok, trace)
+
+    @contextmanager
+    def trace(self) -> Iterator[Trace]:
+        """Collect the spans recorded in this context (thread or task) into a new ``Trace``."""
+        trace = Trace()
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {stage: list(values) for stage, values in self._histograms.items()}
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters.items())],
+            "stages": {stage: {"count": int(values[-2]), "total_seconds": round(values[-1], 6),
+                               "mean_ms": round(values[-1] / values[-2] * 1000, 2) if values[-2] else 0.0}
+                       for stage, values in sorted(histograms.items())}
+        }
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition (version 0.0.4); ``gauges`` adds point-in-time values."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {stage: list(values) for stage, values in self._histograms.items()}
+        lines = []
+        for name, help_text in COUNTERS.items():
+            lines += [f"# HELP ragify_{name}_total {help_text}", f"# TYPE ragify_{name}_total counter"]
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"ragify_{name}_total{_labels(labels)} {_number(value)}")
+        lines += ["# HELP ragify_stage_seconds Latency of each query stage",
+                  "# TYPE ragify_stage_seconds histogram"]
+        for stage, values in sorted(histograms.items()):
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"ragify_stage_seconds_bucket{_labels((('stage', stage), ('le', _number(bound))))} {count}")
+            lines.append(f"ragify_stage_seconds_bucket{_labels((('stage', stage), ('le', '+Inf')))} {values[-2]}")
+            lines.append(f"ragify_stage_seconds_sum{_labels((('stage', stage),))} {values[-1]:.6f}")
+            lines.append(f"ragify_stage_seconds_count{_labels((('stage', stage),))} {values[-2]}")
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE ragify_{name} gauge", f"ragify_{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _labels(labels) -> str:
+    if not labels: return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+# Process-wide, like the caches it reports on: the Streamlit app and the service share it
+METRICS = Metrics()
@@ -0,0 +1,221 @@
+import logging
+import os
+import re
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from .utils import logger, atomic_write_json, read_json
+
+ONNX_VARIANTS = {"fp32": "model.onnx", "int8": "model_int8.onnx"}
+_META_FILE = "encoder.json"
+_POOLING_MODES = ("mean", "cls", "max")
+
+# Texts the exported model must embed like the PyTorch one: prose, code, short and truncated inputs
+PARITY_PROBES = [
+    "How do I authenticate requests to the API?",
+    "Rate limits are applied per API key. When the limit is exceeded the server responds with "
+    "HTTP 429 and a Retry-After header giving the number of seconds to wait.",
+    "curl https://api.example.com/v1/messages -H 'Authorization: Bearer $KEY' -d '{\"model\": \"m\"}'",
+    "def paginate(client, cursor=None):\n    while True:\n        page = client.list(cursor=cursor)\n"
+    "        yield from page.items\n        cursor = page.next_cursor",
+    "Webhooks",
+    "Streaming responses are sent as server-sent events; each event carries a JSON delta. " * 40,
+    "Fehlerbehandlung: Die API gibt bei ungültigen Parametern den Status 400 zurück.",
+    "GET /repos/{owner}/{repo}/issues?state=open&per_page=100",
+]
+
+class _Tokenizer:
+    """The parts of a Hugging Face fast tokenizer TokenChunker and EmbeddingsManager use.
+
+    Built on the ``tokenizers`` library directly, since importing
+    ``transformers`` pulls in torch, which the ONNX backend exists to avoid.
+    """
+
+    is_fast = True
+
+    def __init__(self, directory: str, max_length: int):
+        from tokenizers import Tokenizer
+        path = os.path.join(directory, "tokenizer.json")
+        self._raw = Tokenizer.from_file(path)
+        self._raw.no_truncation()
+        self._raw.no_padding()
+        config = read_json(os.path.join(directory, "tokenizer_config.json"), "tokenizer config") or {}
+        self.do_lower_case = bool(config.get("do_lower_case", False))
+        pad = config.get("pad_token") or "[PAD]"
+        pad = pad.get("content", "[PAD]") if isinstance(pad, dict) else pad
+        self._batch = Tokenizer.from_file(path)
+        self._batch.enable_truncation(max_length)
+        self._batch.enable_padding(pad_id=self._batch.token_to_id(pad) or 0, pad_token=pad)
+
+    def __call__(self, texts: List[str], add_special_tokens: bool = True, return_offsets_mapping: bool = False,
+                 **_: Any) -> Dict[str, List[Any]]:
+        encodings = self._raw.encode_batch(texts, add_special_tokens=add_special_tokens)
+        result = {"input_ids": [e.ids for e in encodings], "attention_mask": [e.attention_mask for e in encodings]}
+        if return_offsets_mapping:
+            result["offset_mapping"] = [e.offsets for e in encodings]
+        return result
+
+    def batch(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Padded and truncated model inputs for ``texts``."""
+        encodings = self._batch.encode_batch(texts)
+        return {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)}
+
+class OnnxEncoder:
+    """A SentenceTransformer stand-in that runs an exported transformer with ONNX Runtime on CPU.
+
+    Tokenization, mean/CLS/max pooling and normalization are reproduced in
+    numpy from the settings recorded at export, so only ``onnxruntime`` and
+    ``tokenizers`` are loaded at run time. Texts are sorted by length before
+    batching, as sentence-transformers does, to keep padding small.
+    """
+
+    def __init__(self, directory: str, variant: str = "fp32", threads: int = 0):
+        import onnxruntime
+        self.meta = read_json(os.path.join(directory, _META_FILE), "ONNX export metadata") or {}
+        self.variant = variant
+        self.max_seq_length = self.meta["max_seq_length"]
+        self.tokenizer = _Tokenizer(directory, self.max_seq_length)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(os.path.join(directory, ONNX_VARIANTS[variant]), options,
+                                                    providers=["CPUExecutionProvider"])
+        self._inputs = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32, show_progress_bar: Optional[bool] = None,
+               normalize_embeddings: bool = False, **_: Any) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [str(s).strip() for s in ([sentences] if single else sentences)]
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.meta["dimension"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            features = self.tokenizer.batch([texts[i] for i in rows])
+            tokens = self.session.run(None, {name: features[name] for name in self._inputs})[0]
+            embeddings[rows] = _pool(tokens, features["attention_mask"], self.meta["pooling"])
+        if self.meta["normalize"] or normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1.0, norms)
+        return embeddings[0] if single else embeddings
+
+def _pool(tokens: np.ndarray, mask: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "cls":
+        return tokens[:, 0]
+    mask = mask[..., None].astype(tokens.dtype)
+    if mode == "max":
+        return np.where(mask > 0, tokens, -1e9).max(axis=1)
+    return (tokens * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+def model_directory(root: str, model_name: str) -> str:
+    return os.path.join(root, re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_"))
+
+def _model_settings(model) -> Dict[str, Any]:
+    """Pooling and normalization of a Transformer -> Pooling [-> Normalize] model, the only layout exported."""
+    modules = [type(module).__name__ for module in model]
+    if modules not in (["Transformer", "Pooling"], ["Transformer", "Pooling", "Normalize"]):
+        raise ValueError(f"Only Transformer + Pooling (+ Normalize) models can be exported, not {' + '.join(modules)}")
+    config = model[1].get_config_dict()
+    # Older sentence-transformers versions record the mode as one boolean flag per mode
+    mode = config.get("pooling_mode") or next(
+        (m for m in _POOLING_MODES if config.get(f"pooling_mode_{m}_tokens")), None)
+    if mode not in _POOLING_MODES:
+        raise ValueError(f"Unsupported pooling mode {mode!r}")
+    return {"pooling": mode, "normalize": modules[-1] == "Normalize", "max_seq_length": model.max_seq_length,
+            "dimension": getattr(model, "get_embedding_dimension", model.get_sentence_embedding_dimension)()}
+
+def _export(model, directory: str) -> List[str]:
+    import inspect
+    import torch
+
+    transformer = model[0].auto_model.eval()
+    if hasattr(transformer, "set_attn_implementation"):
+        # Eager attention traces to plain MatMul/Softmax nodes, which run and quantize faster than traced SDPA
+        transformer.set_attn_implementation("eager")
+    inputs = ["input_ids", "attention_mask"]
+    if "token_type_ids" in inspect.signature(transformer.forward).parameters:
+        inputs.append("token_type_ids")
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *features):
+            return self.transformer(**dict(zip(inputs, features)), return_dict=True).last_hidden_state
+
+    example = model.tokenizer(["an example input"], return_tensors="pt")
+    path = os.path.join(directory, ONNX_VARIANTS["fp32"])
+    # The TorchScript exporter: newer torch defaults to the dynamo one, which needs onnxscript
+    export_options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.onnx.export(TokenEmbeddings(), tuple(example[name] for name in inputs), f"{path}.tmp",
+                          input_names=inputs, output_names=["token_embeddings"],
+                          dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in inputs},
+                                        "token_embeddings": {0: "batch", 1: "sequence"}},
+                          opset_version=17, **export_options)
+    os.replace(f"{path}.tmp", path)
+    return inputs
+
+def _quantize(directory: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    path = os.path.join(directory, ONNX_VARIANTS["int8"])
+    # Weights become int8; activations are quantized on the fly, so no calibration data is needed
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(max(level, logging.WARNING))  # the quantizer logs every tensor it visits
+    try:
+        quantize_dynamic(os.path.join(directory, ONNX_VARIANTS["fp32"]), f"{path}.tmp", weight_type=QuantType.QInt8)
+    finally:
+        root.setLevel(level)
+    os.replace(f"{path}.tmp", path)
+
+def parity(reference, encoder: OnnxEncoder, texts: Sequence[str] = PARITY_PROBES) -> Dict[str, float]:
+    """Cosine agreement between the PyTorch model's embeddings and the exported model's."""
+    expected = reference.encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+    actual = encoder.encode(list(texts), normalize_embeddings=True)
+    cosines = np.sum(expected * actual, axis=1)
+    return {"min_cosine": round(float(cosines.min()), 6), "mean_cosine": round(float(cosines.mean()), 6)}
+
+def build_onnx_model(model_name: str, directory: str, variant: str = "fp32") -> Dict[str, Any]:
+    """Export ``model_name`` (and quantize it for "int8"), check parity and record it in the directory's metadata.
+
+    Needs torch, sentence-transformers and the ``onnx`` package; this runs once
+    per model and variant, after which loading needs neither.
+    """
+    from sentence_transformers import SentenceTransformer
+    os.makedirs(directory, exist_ok=True)
+    reference = SentenceTransformer(model_name, device="cpu")
+    meta = read_json(os.path.join(directory, _META_FILE), "ONNX export metadata") or {}
+    if meta.get("model") != model_name or not os.path.exists(os.path.join(directory, ONNX_VARIANTS["fp32"])):
+        meta = {"model": model_name, **_model_settings(reference), "variants": {}}
+        meta["inputs"] = _export(reference, directory)
+        reference.tokenizer.save_pretrained(directory)
+        atomic_write_json(os.path.join(directory, _META_FILE), meta, indent=2)
+    if variant == "int8":
+        _quantize(directory)
+    meta["variants"][variant] = parity(reference, OnnxEncoder(directory, variant))
+    atomic_write_json(os.path.join(directory, _META_FILE), meta, indent=2)
+    return meta
+
+def load_onnx_encoder(model_name: str, root: str, variant: str = "fp32", min_parity: float = 0.99,
+                      threads: int = 0) -> OnnxEncoder:
+    """The ONNX encoder for ``model_name``, exported on first use.
+
+    Raises when the runtime is missing, the export fails or the exported
+    model's embeddings agree with PyTorch's by less than ``min_parity``
+    cosine, so the caller can fall back to sentence-transformers.
+    """
+    import onnxruntime  # noqa: F401 - fail before exporting anything if the runtime is missing
+    directory = model_directory(root, model_name)
+    meta = read_json(os.path.join(directory, _META_FILE), "ONNX export metadata") or {}
+    if meta.get("model") != model_name or variant not in meta.get("variants", {}):
+        logger.info(f"Exporting {model_name} to ONNX ({variant}) in {directory}; this happens once")
+        meta = build_onnx_model(model_name, directory, variant)
+    agreement = meta["variants"][variant]["min_cosine"]
+    if agreement < min_parity:
+        raise ValueError(f"{variant} export agrees with PyTorch to cosine {agreement:.4f}, below {min_parity}")
+    return OnnxEncoder(directory, variant, threads)
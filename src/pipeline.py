@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+from .embeddings import EmbeddingsManager
+from .scraper import APIDocsScraper
+from .utils import logger, EMBED_FLUSH_TIMEOUT, PIPELINE_QUEUE_SIZE
+
+_DONE = object()
+
+class IngestPipeline:
+    """Overlapping scrape -> chunk -> encode -> write ingest.
+
+    Each stage runs in its own thread and hands work on through a bounded
+    queue, so pages are chunked as they arrive, the encoder works on one
+    batch while the previous one is written, and memory is capped by the
+    queue sizes. Chunks are batched up to ``batch_size`` (by default the
+    manager's ``encode_batch_size``) or until the oldest waiting chunk is
+    ``flush_timeout`` seconds old.
+    """
+
+    def __init__(self, scraper: APIDocsScraper, embeddings: EmbeddingsManager,
+                 batch_size: Optional[int] = None, flush_timeout: float = EMBED_FLUSH_TIMEOUT,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 on_progress: Optional[Callable[[Dict[str, int]], None]] = None):
+        self.scraper = scraper
+        self.embeddings = embeddings
+        # Defaults to the manager's size, which grows to EMBED_MP_MIN_TEXTS when an encode pool is in use
+        self.batch_size = max(1, batch_size or embeddings.encode_batch_size)
+        self.flush_timeout = flush_timeout
+        self.queue_size = max(1, queue_size)
+        self.on_progress = on_progress
+        self.stats = {
+            "pages_total": 0, "pages_fetched": 0, "pages_failed": 0, "pages_unchanged": 0,
+            "chunks_planned": 0, "chunks_embedded": 0, "chunks_written": 0
+        }
+        self._stats_lock = threading.Lock()
+        self._failed = threading.Event()
+        self._error: Optional[BaseException] = None
+        # Pages the scraper couldn't fetch, left out of the recorded corpus
+        self._failed_urls: Set[str] = set()
+        # url -> [chunks still to write, plan]
+        self._pending: Dict[str, List[Any]] = {}
+
+    def run(self, urls: List[str]) -> Dict[str, int]:
+        pages: queue.Queue = queue.Queue(self.queue_size)
+        batches: queue.Queue = queue.Queue(self.queue_size)
+        writes: queue.Queue = queue.Queue(self.queue_size)
+        self._count(pages_total=len(dict.fromkeys(urls)))
+
+        stages = [
+            threading.Thread(target=self._stage, args=(self._fetch, urls, pages), name="ingest-fetch"),
+            threading.Thread(target=self._stage, args=(self._chunk, pages, batches), name="ingest-chunk"),
+            threading.Thread(target=self._stage, args=(self._encode, batches, writes), name="ingest-encode"),
+            threading.Thread(target=self._stage, args=(self._write, writes, None), name="ingest-write"),
+        ]
+        start = time.perf_counter()
+        for thread in stages: thread.start()
+        for thread in stages: thread.join()
+
+        if not self._error:
+            # Only what was actually ingested: after a partial run the recorded URLs differ from the
+            # requested ones (replacing any earlier complete record), so the next startup re-ingests
+            self.embeddings.record_corpus([url for url in urls if url not in self._failed_urls])
+        self.embeddings.save_state()
+        if self._error:
+            raise self._error
+
+        logger.info(f"Ingest pipeline finished in {time.perf_counter() - start:.1f}s: {self.stats}")
+        return dict(self.stats)
+
+    def progress(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+            snapshot = dict(self.stats)
+        if self.on_progress:
+            self.on_progress(snapshot)
+
+    def _stage(self, work: Callable, source, sink: Optional[queue.Queue]):
+        try:
+            work(source, sink)
+        except BaseException as e:
+            logger.error(f"Ingest stage {threading.current_thread().name} failed: {e}")
+            self._error = self._error or e
+            self._failed.set()
+        finally:
+            if sink is not None:
+                self._put(sink, _DONE)
+
+    def _put(self, q: queue.Queue, item):
+        # A bounded put that gives up once another stage has failed, so nothing deadlocks
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._failed.is_set():
+                    return
+
+    def _get(self, q: queue.Queue, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._failed.is_set():
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return q.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fetch(self, urls: List[str], pages: queue.Queue):
+        for doc in self.scraper.iter_scrape(urls, self.embeddings.manifest):
+            if self._failed.is_set(): return
+            if 'error' in doc:
+                self._failed_urls.add(doc['url'])
+            self._count(**{"pages_failed" if 'error' in doc else "pages_fetched": 1})
+            self._put(pages, doc)
+
+    def _chunk(self, pages: queue.Queue, batches: queue.Queue):
+        buffer: List[tuple] = []
+        oldest = 0.0
+
+        def flush():
+            nonlocal buffer
+            if buffer:
+                self._put(batches, buffer)
+                buffer = []
+
+        while True:
+            timeout = None if not buffer else max(0.0, oldest + self.flush_timeout - time.monotonic())
+            try:
+                doc = self._get(pages, timeout)
+            except queue.Empty:
+                flush()
+                continue
+            if doc is _DONE:
+                flush()
+                return
+
+            plan = self.embeddings.plan_page(doc)
+            if plan is None:
+                if 'error' not in doc: self._count(pages_unchanged=1)
+                continue
+            if not plan["ids"]:
+                # Only removals: nothing to encode
+                self.embeddings.finish_page(plan)
+                continue
+
+            with self._stats_lock:
+                self._pending[plan["url"]] = [len(plan["ids"]), plan]
+            self._count(chunks_planned=len(plan["ids"]))
+            for item in zip(plan["ids"], plan["documents"], plan["metadatas"], [plan["url"]] * len(plan["ids"])):
+                if not buffer: oldest = time.monotonic()
+                buffer.append(item)
+                if len(buffer) >= self.batch_size:
+                    flush()
+
+    def _encode(self, batches: queue.Queue, writes: queue.Queue):
+        while (batch := self._get(batches)) is not _DONE:
+            ids, documents, metadatas, urls = zip(*batch)
+            embeddings = self.embeddings.create_embeddings(list(documents))
+            self._count(chunks_embedded=len(ids))
+            self._put(writes, (list(ids), list(documents), list(metadatas), embeddings, urls))
+
+    def _write(self, writes: queue.Queue, _sink):
+        while (item := self._get(writes)) is not _DONE:
+            ids, documents, metadatas, embeddings, urls = item
+            self.embeddings.write_chunks(ids, documents, metadatas, embeddings)
+            self._count(chunks_written=len(ids))
+
+            finished = []
+            with self._stats_lock:
+                for url in urls:
+                    entry = self._pending[url]
+                    entry[0] -= 1
+                    if entry[0] == 0:
+                        finished.append(self._pending.pop(url)[1])
+            for plan in finished:
+                self.embeddings.finish_page(plan)
@@ -1,21 +1,29 @@
-from groq import Groq
+import asyncio
+import contextvars
+import functools
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from . import resources
+from .context import ContextPacker, estimate_tokens
 from .embeddings import EmbeddingsManager
-from .utils import logger
+from .llm import LLMBackend
+from .metrics import METRICS, Trace
+from .utils import logger, detect_source, ALL_SOURCES, LLM_MAX_TOKENS
+
+ERROR_PREFIX = "Error generating response:"
 
 class SmartAPIAssistant:
-    def __init__(self):
+    def __init__(self, llm: Optional[LLMBackend] = None):
         self.embeddings_manager = EmbeddingsManager()
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.answer_cache = resources.get_answer_cache(
+            os.path.join(self.embeddings_manager.persist_path, "answer_cache.json"))
+        self.llm = llm or resources.get_llm_backend()
+        self.packer = ContextPacker()
         self.system_prompt = self.system_prompt = """You are RAGify, an advanced API Documentation Explorer using retrieval-augmented generation. Help developers with clear, practical guidance.
 
 Guidelines:
 
-- if a question is asked from gemini it should include only responses from gemini docs and not claude or github
-- if a question is asked from github it should include only responses from gemini docs and not gemini or claude
-- if a question is asked from claude or anthropic it should include only responses from gemini docs and not github or gemini
-- example: if you find a query for claude api docs but instead its available in claude api docs, then clarify that based on given documents "the information is not available for claude api docs however for github" and then you may continue with the relevant info.
+- When a target API is given, the documentation has already been filtered to it; if the provided sources come from a different API, say the information is not available for the target API before continuing with what is relevant
 - Base answers on provided documentation
 - Include code examples when available  
 - Be concise but comprehensive
@@ -23,59 +31,162 @@ Guidelines:
 - If unsure, say so clearly
 - but if you think it is a general queru then you may combine multiple relevant answer"""
     
-    def generate_response(self, query: str, docs: List[Dict], history: Optional[List] = None) -> str:
-        context = self._prepare_context(docs)
+    def _build_messages(self, query: str, docs: List[Dict], history: Optional[List] = None,
+                        source: Optional[str] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+        """Messages for one request, plus the packer's record of the docs and token budget it used."""
+        target = f"Target API: {source}\n\n" if source else ""
+        head = f"{target}Question: {query}\n\nDocumentation:\n"
+        tail = "\n\nAnswer based on the documentation:"
+        with METRICS.span("build_context"):
+            packed = self.packer.pack(self.system_prompt, head + tail, docs, history)
+        logger.info(f"Context budget: {packed['budget']}")
         
         messages = [{"role": "system", "content": self.system_prompt}]
-        if history: messages.extend(history[-4:])
+        messages.extend(packed["history"])
         
         messages.append({
             "role": "user", 
-            "content": f"Question: {query}\n\nDocumentation:\n{context}\n\nAnswer based on the documentation:"
+            "content": f"{head}{packed['context']}{tail}"
         })
-        
+        return messages, packed
+    
+    def generate_response(self, query: str, docs: List[Dict], history: Optional[List] = None,
+                          source: Optional[str] = None) -> str:
+        messages, _ = self._build_messages(query, docs, history, source)
+        return self._complete(messages)
+    
+    def _complete(self, messages: List[Dict]) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=messages,
-                temperature=0.3,
-                max_tokens=800
-            )
-            return response.choices[0].message.content
+            with METRICS.span("llm"):
+                return self.llm.complete(messages, temperature=0.3, max_tokens=LLM_MAX_TOKENS)
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            return f"{ERROR_PREFIX} {str(e)}"
     
-    def _prepare_context(self, docs: List[Dict]) -> str:
-        if not docs: return "No relevant documentation found."
-        
-        context = []
-        for i, doc in enumerate(docs[:3], 1):
-            content = doc.get('content', '')[:400]
-            source = doc.get('metadata', {}).get('source', 'Unknown')
-            url = doc.get('metadata', {}).get('url', '')
-            context.append(f"Source {i} ({source}):\nURL: {url}\nContent: {content}\n")
-        
-        return "\n".join(context)
+    def _stream(self, messages: List[Dict], trace: Optional[Trace] = None) -> Iterator[str]:
+        # The stream is consumed after the request's trace context has exited, so it is passed in
+        try:
+            with METRICS.span("llm", trace):
+                yield from self.llm.stream(messages, temperature=0.3, max_tokens=LLM_MAX_TOKENS)
+        except Exception as e:
+            yield f"{ERROR_PREFIX} {str(e)}"
     
-    def search_and_respond(self, query: str, history: Optional[List] = None) -> Dict[str, Any]:
-        docs = self.embeddings_manager.search_similar(query, n_results=5)
-        
-        if not docs:
-            return {
-                "response": "No relevant documentation found. Please load the documentation first.",
-                "sources": []
-            }
-        
-        response = self.generate_response(query, docs, history)
-        
+    def _format_sources(self, docs: List[Dict]) -> List[Dict[str, Any]]:
         sources = []
-        for doc in docs[:3]:
+        for doc in docs:
             meta = doc.get('metadata', {})
+            anchor = meta.get('anchor', '')
             sources.append({
                 "source": meta.get('source', 'Unknown'),
-                "url": meta.get('url', ''),
+                "url": f"{meta.get('url', '')}#{anchor}" if anchor else meta.get('url', ''),
                 "title": meta.get('title', ''),
+                "section": meta.get('section', ''),
                 "similarity": round(doc.get('similarity', 0), 3)
             })
+        return sources
+    
+    def resolve_source(self, query: str, source: Optional[str] = None) -> Optional[str]:
+        """Source to restrict retrieval to: explicit choice, ALL_SOURCES for none, or detected from the query."""
+        if source is None:
+            return detect_source(query)
+        return None if source == ALL_SOURCES else source
+    
+    def _cached_answer(self, query: str, source: Optional[str], embedding: Optional[List[float]] = None):
+        if embedding is None:
+            embedding = self.embeddings_manager.embed_query(query)
+        with METRICS.span("answer_cache"):
+            version = self.embeddings_manager.collection_version()
+            cached = self.answer_cache.lookup(embedding, version, scope=source or "")
+        METRICS.inc("cache_hits" if cached else "cache_misses", cache="answer")
+        return embedding, version, cached
+    
+    def _prepare(self, query: str, history: Optional[List], source: Optional[str],
+                 query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Everything before the LLM call.
+        
+        Returns ``{"result": ...}`` when the question is answered without the
+        LLM (cached, or nothing found); otherwise the messages to send and
+        what is needed to format and cache the answer.
+        """
+        METRICS.inc("queries")
+        source = self.resolve_source(query, source)
+        embedding, version, cached = self._cached_answer(query, source, query_embedding)
+        if cached:
+            return {"result": dict(cached, cached=True)}
+        
+        docs = self.embeddings_manager.search_similar(query, n_results=5, query_embedding=embedding, source=source)
+        
+        if not docs:
+            return {"result": {
+                "response": "No relevant documentation found. Please load the documentation first.",
+                "sources": []
+            }}
         
-        return {"response": response, "sources": sources}
\ No newline at end of file
+        messages, packed = self._build_messages(query, docs, history, source)
+        return {"messages": messages, "packed": packed, "embedding": embedding, "version": version,
+                "scope": source or "", "sources": self._format_sources(packed["docs"])}
+    
+    def _finish(self, plan: Dict[str, Any], response: str) -> Dict[str, Any]:
+        budget = plan["packed"]["budget"]
+        result = {"response": response, "sources": plan["sources"], "context_budget": budget}
+        METRICS.inc("llm_tokens", budget["used"] - budget["answer_reserved"], direction="in")
+        if ERROR_PREFIX not in response:
+            METRICS.inc("llm_tokens", estimate_tokens(response), direction="out")
+            self.answer_cache.store(plan["embedding"], result, plan["version"], scope=plan["scope"])
+        return result
+    
+    def search_and_respond(self, query: str, history: Optional[List] = None, source: Optional[str] = None,
+                           query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Answer ``query``; pass ``query_embedding`` when it was already computed (e.g. in a batch).
+        
+        The result's ``timings`` lists how long each stage took.
+        """
+        with METRICS.trace() as trace:
+            plan = self._prepare(query, history, source, query_embedding)
+            result = plan["result"] if "result" in plan else self._finish(plan, self._complete(plan["messages"]))
+        return dict(result, timings=trace.spans)
+    
+    async def asearch_and_respond(self, query: str, history: Optional[List] = None, source: Optional[str] = None,
+                                  query_embedding: Optional[List[float]] = None, executor=None) -> Dict[str, Any]:
+        """Async search_and_respond: retrieval runs in ``executor``, and the LLM call is awaited without a thread."""
+        with METRICS.trace() as trace:
+            # Executor threads don't inherit context variables, so the trace is carried over explicitly
+            prepare = functools.partial(contextvars.copy_context().run, self._prepare)
+            plan = await asyncio.get_running_loop().run_in_executor(
+                executor, prepare, query, history, source, query_embedding)
+            if "result" in plan:
+                return dict(plan["result"], timings=trace.spans)
+            try:
+                with METRICS.span("llm"):
+                    response = await self.llm.acomplete(plan["messages"], temperature=0.3, max_tokens=LLM_MAX_TOKENS)
+            except Exception as e:
+                response = f"{ERROR_PREFIX} {str(e)}"
+            result = self._finish(plan, response)
+        return dict(result, timings=trace.spans)
+    
+    def search_and_stream(self, query: str, history: Optional[List] = None,
+                          source: Optional[str] = None) -> Dict[str, Any]:
+        """Like search_and_respond, but ``stream`` yields the response text as it is generated."""
+        with METRICS.trace() as trace:
+            plan = self._prepare(query, history, source)
+        if "result" in plan:
+            result = dict(plan["result"], timings=trace.spans)
+            result["stream"] = iter([result.pop("response")])
+            return result
+        
+        # ``timings`` gains the LLM span once the stream has been consumed
+        stream = self._cache_stream(self._stream(plan["messages"], trace), plan)
+        return {"stream": stream, "sources": plan["sources"], "context_budget": plan["packed"]["budget"],
+                "timings": trace.spans}
+    
+    def _cache_stream(self, stream: Iterator[str], plan: Dict[str, Any]) -> Iterator[str]:
+        parts = []
+        for part in stream:
+            parts.append(part)
+            yield part
+        self._finish(plan, "".join(parts))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            "answers": self.answer_cache.stats(),
+            "query_embeddings": self.embeddings_manager.query_cache.stats()
+        }
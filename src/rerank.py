@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional
+from .utils import logger, RERANK_BUDGET_MS, RERANK_CANDIDATES
+
+class CrossEncoderReranker:
+    """Re-orders retrieval candidates by cross-encoder relevance, within a per-query time budget.
+
+    All (query, passage) pairs are scored in one batched call. The pool is
+    shrunk up front to what the running cost estimate says fits the budget,
+    and a call that still overruns is abandoned in favour of the incoming
+    (bi-encoder / fused) order, so a slow CPU never holds up an answer. While
+    an abandoned call is still running, later queries skip re-ranking rather
+    than queue behind it.
+    """
+
+    # Only a scoring call measures the cost, so each skipped query shrinks the estimate; a
+    # transient slowdown then can't disable re-ranking for good, and a small probe re-measures it
+    SKIP_DECAY = 0.8
+
+    def __init__(self, model, budget_ms: float = RERANK_BUDGET_MS, max_candidates: int = RERANK_CANDIDATES):
+        self.model = model
+        self.budget = budget_ms / 1000
+        self.max_candidates = max(2, max_candidates)
+        # Exponential moving average of seconds per scored pair
+        self.pair_cost: Optional[float] = None
+        self.stats = {"reranked": 0, "skipped": 0, "timeouts": 0}
+        # Guards the estimate, stats and in-flight handle only; never held while the model runs
+        self._lock = threading.Lock()
+        # The last scoring call; an abandoned one can't be interrupted, so nothing queues behind it
+        self._inflight: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+    def rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return ``candidates`` best-first; each re-scored one gains a ``rerank_score``."""
+        if len(candidates) < 2 or self.budget <= 0:
+            return candidates
+        with self._lock:
+            size = min(len(candidates), self.max_candidates)
+            if self.pair_cost:
+                size = min(size, int(self.budget / self.pair_cost))
+            busy = self._inflight is not None and not self._inflight.done()
+            if size < 2 or busy:
+                self.stats["skipped"] += 1
+                if not busy:
+                    self.pair_cost *= self.SKIP_DECAY
+                return candidates
+            pool = candidates[:size]
+            future = self._inflight = self._executor.submit(self._score, query, [c["content"] for c in pool])
+
+        try:
+            scores = future.result(timeout=self.budget)
+        except FutureTimeout:
+            # Only drops it if it hasn't started; a running call finishes and just updates the estimate
+            future.cancel()
+            with self._lock:
+                self.stats["timeouts"] += 1
+            logger.info(f"Re-ranking {size} candidates exceeded {self.budget * 1000:.0f}ms; keeping retrieval order")
+            return candidates
+
+        with self._lock:
+            self.stats["reranked"] += 1
+        for candidate, score in zip(pool, scores):
+            candidate["rerank_score"] = float(score)
+        ranked = sorted(pool, key=lambda c: c["rerank_score"], reverse=True)
+        return ranked + candidates[size:]
+
+    def _score(self, query: str, passages: List[str]) -> List[float]:
+        # Calls are already serialised by the single-worker executor
+        start = time.perf_counter()
+        scores = self.model.predict([(query, p) for p in passages], batch_size=len(passages),
+                                    show_progress_bar=False)
+        cost = (time.perf_counter() - start) / len(passages)
+        with self._lock:
+            self.pair_cost = cost if self.pair_cost is None else 0.8 * self.pair_cost + 0.2 * cost
+        return list(scores)
@@ -0,0 +1,118 @@
+import atexit
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Union
+from .bm25 import BM25Index
+from .cache import QueryEmbeddingCache, SemanticAnswerCache
+from .llm import LLMBackend, create_backend
+from .manifest import PageManifest
+from .rerank import CrossEncoderReranker
+from .vectorstore import NumpyVectorStore
+from .utils import (logger, CHROMA_DB_PATH, EMBEDDING_MODEL, EMBED_BACKEND, EMBED_ONNX_DIR, EMBED_ONNX_THREADS,
+                    EMBED_PARITY_MIN, LLM_BACKEND, QUERY_CACHE_PERSIST, VECTOR_STORE_DTYPE)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from .onnx_encoder import OnnxEncoder
+
+EMBED_BACKENDS = {"torch": None, "onnx": "fp32", "onnx-int8": "int8"}
+
+# Process-wide registry: every Streamlit session and thread shares one instance per key
+_registry: Dict[Hashable, Any] = {}
+_registry_lock = threading.Lock()
+_key_locks: Dict[Hashable, threading.Lock] = {}
+
+def _shared(key: Hashable, factory: Callable[[], Any]) -> Any:
+    if key in _registry:
+        return _registry[key]
+    # One lock per key so a slow model load doesn't block unrelated resources
+    with _registry_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _registry:
+            _registry[key] = factory()
+        return _registry[key]
+
+def get_lock(name: str) -> threading.Lock:
+    return _shared(('lock', name), threading.Lock)
+
+def get_embedding_model(name: str = EMBEDDING_MODEL,
+                        backend: str = EMBED_BACKEND) -> Union["SentenceTransformer", "OnnxEncoder"]:
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(EMBED_BACKENDS)}")
+    def load():
+        variant = EMBED_BACKENDS[backend]
+        if variant:
+            try:
+                from .onnx_encoder import load_onnx_encoder
+                model = load_onnx_encoder(name, EMBED_ONNX_DIR, variant, EMBED_PARITY_MIN, EMBED_ONNX_THREADS)
+                logger.info(f"Loaded embedding model {name} with ONNX Runtime ({variant})")
+                return model
+            except Exception as e:
+                logger.warning(f"ONNX backend unavailable for {name} ({e}); falling back to PyTorch")
+        # Imported here so the ONNX backend never loads torch
+        from sentence_transformers import SentenceTransformer
+        logger.info(f"Loading embedding model {name}")
+        return SentenceTransformer(name)
+    return _shared(('model', name, backend), load)
+
+def get_reranker(name: str) -> CrossEncoderReranker:
+    def load():
+        from sentence_transformers import CrossEncoder
+        logger.info(f"Loading re-ranking model {name}")
+        model = CrossEncoder(name, device='cpu')
+        # The first call pays one-off setup costs that would otherwise blow the first query's budget
+        model.predict([("warm up", "warm up")], show_progress_bar=False)
+        return CrossEncoderReranker(model)
+    return _shared(('reranker', name), load)
+
+def get_llm_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    # Shared so sessions reuse pooled connections; keyed by API key too, since the UI sets it at runtime
+    return _shared(('llm', name, os.getenv("GROQ_API_KEY")), lambda: create_backend(name))
+
+def _import_chromadb():
+    # SQLite compatibility fix for Streamlit Cloud; must run before chromadb's first import
+    if 'pysqlite3' not in sys.modules:
+        __import__('pysqlite3')
+        sys.modules['sqlite3'] = sys.modules['pysqlite3']
+    import chromadb
+    return chromadb
+
+def get_chroma_client(path: str = CHROMA_DB_PATH):
+    path = os.path.abspath(path)
+    return _shared(('chroma', path), lambda: _import_chromadb().PersistentClient(path=path))
+
+def get_numpy_store(path: str, name: str, dtype: str = VECTOR_STORE_DTYPE) -> NumpyVectorStore:
+    path = os.path.abspath(path)
+    return _shared(('numpy_store', path, dtype), lambda: NumpyVectorStore(path, name, dtype))
+
+def get_manifest(path: str) -> PageManifest:
+    path = os.path.abspath(path)
+    return _shared(('manifest', path), lambda: PageManifest(path))
+
+def get_bm25_index(path: str) -> BM25Index:
+    path = os.path.abspath(path)
+    return _shared(('bm25', path), lambda: BM25Index(path))
+
+def get_answer_cache(path: str) -> SemanticAnswerCache:
+    path = os.path.abspath(path)
+    return _shared(('answer_cache', path), lambda: SemanticAnswerCache(path))
+
+def get_query_cache(persist_path: str = CHROMA_DB_PATH) -> QueryEmbeddingCache:
+    path = os.path.join(os.path.abspath(persist_path), "query_embeddings.npz") if QUERY_CACHE_PERSIST else None
+    def create():
+        cache = QueryEmbeddingCache(path)
+        atexit.register(cache.save)
+        return cache
+    return _shared(('query_cache', path), create)
+
+def get_encode_pool(name: str, workers: int):
+    """A multi-process encoding pool of ``workers`` CPU processes for the given model."""
+    def start():
+        logger.info(f"Starting {workers} encoder processes for {name}")
+        model = get_embedding_model(name)
+        pool = model.start_multi_process_pool(target_devices=['cpu'] * workers)
+        atexit.register(model.stop_multi_process_pool, pool)
+        return pool
+    return _shared(('encode_pool', name, workers), start)
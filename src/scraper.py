@@ -1,40 +1,124 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, NavigableString, Tag
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional
 from urllib.parse import urlparse
-from .utils import logger, clean_text
+from .manifest import PageManifest
+from .utils import logger, clean_text, content_hash, SCRAPER_MAX_WORKERS, SCRAPER_PER_HOST
+
+# lxml parses several times faster than the pure-Python parser when it is installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Bump whenever extracted content changes shape, so pages are re-fetched and re-chunked
+EXTRACTOR_VERSION = "sections-1"
+
+SKIP_TAGS = {"script", "style", "nav", "footer", "header"}
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+BLOCK_TAGS = {"p", "li", "td", "th", "dt", "dd", "blockquote"}
 
 class APIDocsScraper:
-    def __init__(self, delay: float = 1.0):
+    def __init__(self, delay: float = 1.0, max_workers: int = SCRAPER_MAX_WORKERS,
+                 per_host: int = SCRAPER_PER_HOST):
         self.delay = delay
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Keep-alive pool sized so concurrent workers don't evict each other's connections
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._host_next_start: Dict[str, float] = {}
+    
+    def scrape_urls(self, urls: List[str], manifest: Optional[PageManifest] = None) -> List[Dict[str, Any]]:
+        """Scrape many URLs concurrently, returning results in input order."""
+        results = {doc['url']: doc for doc in self.iter_scrape(urls, manifest)}
+        return [results[url] for url in urls]
+    
+    def iter_scrape(self, urls: List[str], manifest: Optional[PageManifest] = None) -> Iterator[Dict[str, Any]]:
+        """Scrape many URLs concurrently, yielding each result as soon as it arrives.
+        
+        Hosts are fetched in parallel; each host is limited to ``per_host``
+        in-flight requests whose start times are spaced ``delay`` seconds apart.
+        With a manifest, requests are conditional on the stored validators.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls: return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)),
+                                thread_name_prefix="scraper") as pool:
+            futures = [pool.submit(self.scrape_url, url, manifest.get(url) if manifest else None)
+                       for url in urls]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def _host_slot(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+    
+    def _wait_politely(self, host: str):
+        # Reserve the next start time for this host, then sleep outside the lock
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_start.get(host, 0.0))
+            self._host_next_start[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+    
+    def scrape_url(self, url: str, cached: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        host = urlparse(url).netloc.lower()
+        with self._host_slot(host):
+            self._wait_politely(host)
+            return self._scrape(url, cached or {})
     
-    def scrape_url(self, url: str) -> Dict[str, Any]:
+    def _scrape(self, url: str, cached: Dict[str, Any]) -> Dict[str, Any]:
         try:
             logger.info(f"Scraping: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            headers = {}
+            if cached.get('etag'): headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'): headers['If-Modified-Since'] = cached['last_modified']
             
-            # Remove unwanted elements
-            for tag in soup(["script", "style", "nav", "footer", "header"]):
-                tag.decompose()
+            response = self.session.get(url, timeout=10, headers=headers)
+            if response.status_code == 304:
+                return {"url": url, "source": self._get_source(url), "not_modified": True}
+            response.raise_for_status()
             
-            return {
-                "url": url,
-                "title": self._get_title(soup, url),
-                "content": clean_text(self._get_content(soup)),
-                "source": self._get_source(url)
-            }
+            doc = self.parse_page(url, response.content)
+            doc["etag"] = response.headers.get('ETag', '')
+            doc["last_modified"] = response.headers.get('Last-Modified', '')
+            return doc
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
             return {"url": url, "error": str(e)}
     
+    def parse_page(self, url: str, html) -> Dict[str, Any]:
+        """Extract title, sections and rendered content from a page's HTML (str or bytes)."""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        sections = self._get_sections(soup)
+        content = self._render_content(sections)
+        return {
+            "url": url,
+            "title": self._get_title(soup, url),
+            "content": content,
+            "sections": sections,
+            "source": self._get_source(url),
+            "content_hash": content_hash(content)
+        }
+    
     def _get_title(self, soup: BeautifulSoup, url: str) -> str:
         title = soup.find('title')
         if title: return clean_text(title.get_text())
@@ -42,16 +126,99 @@ class APIDocsScraper:
         if h1: return clean_text(h1.get_text())
         return urlparse(url).path.split('/')[-1] or "API Documentation"
     
-    def _get_content(self, soup: BeautifulSoup) -> str:
+    def _get_sections(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+        """Walk the main content once, emitting deduplicated text, code and heading sections.
+        
+        Each section carries the heading path it sits under and that heading's
+        anchor. Block elements own their inline text (including inline code);
+        nested blocks are emitted on their own, so no text is extracted twice.
+        """
         # Find main content
         main = soup.select_one('main, article, .content, .documentation, [role="main"]') or soup.find('body')
-        if not main: return ""
+        if not main: return []
+        
+        sections: List[Dict[str, Any]] = []
+        path: List[tuple] = []  # (level, title, anchor)
+        seen = set()
         
-        # Extract meaningful text
-        elements = main.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'li', 'td', 'code', 'pre'])
-        content = [elem.get_text().strip() for elem in elements if len(elem.get_text().strip()) > 10]
+        def emit(kind: str, text: str):
+            key = (kind, text)
+            if key in seen: return
+            seen.add(key)
+            sections.append({
+                "kind": kind,
+                "text": text,
+                "heading": " > ".join(title for _, title, _ in path),
+                "anchor": path[-1][2] if path else ""
+            })
         
-        return "\n\n".join(content)
+        def visit(node: Tag):
+            name = node.name
+            if name in SKIP_TAGS:
+                return
+            if name in HEADING_TAGS:
+                title = self._get_heading_text(node)
+                if not title: return
+                level = HEADING_TAGS[name]
+                while path and path[-1][0] >= level:
+                    path.pop()
+                path.append((level, title, self._get_anchor(node)))
+                emit("heading", title)
+            elif name == 'pre' or name == 'code':
+                # <code> only reaches here outside a block; inside one it is inline text
+                code = node.get_text().strip()
+                if len(code) > 10: emit("code", code)
+            elif name in BLOCK_TAGS:
+                nested: List[Tag] = []
+                text = clean_text("".join(inline_text(node, nested)))
+                if len(text) > 10: emit("text", text)
+                for child in nested:
+                    visit(child)
+            else:
+                for child in node.children:
+                    if isinstance(child, Tag): visit(child)
+        
+        def inline_text(node: Tag, nested: List[Tag]):
+            for child in node.children:
+                if isinstance(child, Tag):
+                    if child.name in SKIP_TAGS: continue
+                    if child.name in BLOCK_TAGS or child.name in HEADING_TAGS or child.name == 'pre':
+                        nested.append(child)
+                    else:
+                        yield from inline_text(child, nested)
+                elif type(child) is NavigableString:
+                    yield str(child)
+        
+        visit(main)
+        return sections
+    
+    def _get_heading_text(self, heading: Tag) -> str:
+        # Drop permalink glyphs such as "#" or "¶" that docs sites append to headings
+        parts = [str(text) for text in heading.find_all(string=True)
+                 if not (text.parent.name == 'a' and text.parent.get('href', '').startswith('#')
+                         and len(text.strip()) <= 2)]
+        return clean_text("".join(parts))
+    
+    def _get_anchor(self, heading: Tag) -> str:
+        if heading.get('id'): return heading['id']
+        link = heading.find('a', href=True)
+        if link and link['href'].startswith('#'): return link['href'][1:]
+        parent = heading.parent
+        return parent.get('id', '') if parent is not None and parent.name == 'section' else ''
+    
+    def _render_content(self, sections: List[Dict[str, Any]]) -> str:
+        # Blank-line separated blocks; headings are marked with '#' and code keeps
+        # its line breaks inside a fence, for the chunker
+        blocks = []
+        for section in sections:
+            if section["kind"] == "heading":
+                level = section["heading"].count(" > ") + 1
+                blocks.append(f"{'#' * level} {section['text']}")
+            elif section["kind"] == "code":
+                blocks.append(f"```\n{section['text']}\n```")
+            else:
+                blocks.append(section["text"])
+        return "\n\n".join(blocks)
     
     def _get_source(self, url: str) -> str:
         domain = urlparse(url).netloc.lower()
@@ -0,0 +1,265 @@
+"""Headless RAGify Q&A service: a small asyncio HTTP API over SmartAPIAssistant.
+
+Usage: python -m src.service [--host 127.0.0.1] [--port 8000] [--stub-llm] [--load | --snapshot corpus.zip]
+
+Endpoints:
+  POST /query   {"query": "...", "source": null, "history": []} -> answer and sources
+  GET  /health  liveness and collection size
+  GET  /stats   request, batching and cache counters
+  GET  /metrics stage latencies and counters in Prometheus text format
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from .metrics import METRICS
+from .utils import (logger, SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_CONCURRENCY, SERVICE_MAX_QUEUE,
+                    SERVICE_BATCH_WINDOW_MS, SERVICE_MAX_BATCH, LLM_STUB_LATENCY, ALL_SOURCES, SOURCE_KEYWORDS)
+
+MAX_BODY_BYTES = 64 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class QueryBatcher:
+    """Coalesces query embeddings: queries arriving within ``window`` seconds share one encoder call."""
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]], window: float = SERVICE_BATCH_WINDOW_MS / 1000,
+                 max_batch: int = SERVICE_MAX_BATCH):
+        self.embed_batch = embed
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.stats = {"batches": 0, "queries": 0, "largest_batch": 0}
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks; hold in-flight encodes until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        # Encoding is serialised by the model lock anyway; one thread keeps batches in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-encode")
+
+    async def embed(self, query: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._encode(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _encode(self, batch: List[Tuple[str, asyncio.Future]]):
+        self.stats["batches"] += 1
+        self.stats["queries"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.embed_batch, [query for query, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done(): future.set_exception(e)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done(): future.set_result(embedding)
+
+class RAGService:
+    """Serves SmartAPIAssistant over HTTP with batched query encoding and bounded concurrency.
+
+    At most ``max_concurrency`` requests run retrieval and generation at once
+    and up to ``max_queue`` more wait for a slot; anything beyond that is
+    turned away with 503 and Retry-After instead of piling up. Retrieval runs
+    in a thread pool; the LLM call is awaited through the backend's async API.
+    """
+
+    def __init__(self, assistant, max_concurrency: int = SERVICE_MAX_CONCURRENCY,
+                 max_queue: int = SERVICE_MAX_QUEUE, batcher: Optional[QueryBatcher] = None):
+        self.assistant = assistant
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.batcher = batcher or QueryBatcher(assistant.embeddings_manager.embed_queries)
+        self.stats = {"requests": 0, "answered": 0, "rejected": 0, "errors": 0, "total_seconds": 0.0}
+        self.in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="query")
+
+    async def start(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> asyncio.AbstractServer:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"RAGify service listening on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+        return server
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            self._write_response(writer, 413 if "too large" in str(e) else 400, {"error": str(e)}, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ValueError("malformed request line")
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Union[Dict[str, Any], str],
+                        keep_alive: bool):
+        # Text payloads are Prometheus expositions; everything else is JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict[str, Any], str]]:
+        routes = {"/query": ("POST", self._query), "/health": ("GET", self._health), "/stats": ("GET", self._stats),
+                  "/metrics": ("GET", self._metrics)}
+        if path not in routes:
+            status, payload = 404, {"error": f"no route for {path}"}
+        elif method != routes[path][0]:
+            status, payload = 405, {"error": f"use {routes[path][0]} for {path}"}
+        else:
+            status, payload = await routes[path][1](body)
+        METRICS.inc("http_requests", path=path if path in routes else "other", status=str(status))
+        return status, payload
+
+    async def _query(self, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        try:
+            request = json.loads(body or b"{}")
+            query = request["query"].strip()
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return 400, {"error": 'expected a JSON body like {"query": "..."}'}
+        if not query:
+            return 400, {"error": "query is empty"}
+        history, source = request.get("history") or [], request.get("source")
+        if not isinstance(history, list) or not all(
+                isinstance(turn, dict) and isinstance(turn.get("role"), str) and isinstance(turn.get("content"), str)
+                for turn in history):
+            return 400, {"error": 'history must be a list of {"role": "...", "content": "..."} objects'}
+        if source is not None and source not in (ALL_SOURCES, *SOURCE_KEYWORDS):
+            return 400, {"error": f"source must be null, {ALL_SOURCES!r} or one of {', '.join(map(repr, SOURCE_KEYWORDS))}"}
+
+        self.stats["requests"] += 1
+        if self.in_flight >= self.max_concurrency + self.max_queue:
+            self.stats["rejected"] += 1
+            return 503, {"error": "service busy, retry shortly"}
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            embedding = await self.batcher.embed(query)
+            async with self._slots:
+                result = await self.assistant.asearch_and_respond(
+                    query, history, source, query_embedding=embedding,
+                    executor=self._executor)
+            self.stats["answered"] += 1
+            return 200, dict(result, seconds=round(time.perf_counter() - start, 4))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Query failed: {e}")
+            return 500, {"error": str(e)}
+        finally:
+            self.in_flight -= 1
+            self.stats["total_seconds"] += time.perf_counter() - start
+
+    async def _health(self, _body: bytes) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"status": "ok", **self.assistant.embeddings_manager.get_collection_stats()}
+
+    async def _metrics(self, _body: bytes) -> Tuple[int, str]:
+        return 200, METRICS.render({
+            "service_in_flight": self.in_flight,
+            "service_max_concurrency": self.max_concurrency,
+            "query_batch_largest": self.batcher.stats["largest_batch"]
+        })
+
+    async def _stats(self, _body: bytes) -> Tuple[int, Dict[str, Any]]:
+        served = self.stats["answered"] + self.stats["errors"]
+        return 200, {
+            **self.stats,
+            "mean_seconds": round(self.stats["total_seconds"] / served, 4) if served else 0.0,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "batching": dict(self.batcher.stats),
+            "caches": self.assistant.cache_stats(),
+            "stages": METRICS.snapshot()["stages"]
+        }
+
+async def serve(service: RAGService, host: str, port: int):
+    server = await service.start(host, port)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless RAGify Q&A service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--stub-llm", action="store_true", help="answer with the offline stub backend (LLM_BACKEND=stub)")
+    parser.add_argument("--stub-latency", type=float, default=LLM_STUB_LATENCY, help="seconds the stub takes per answer")
+    parser.add_argument("--load", action="store_true", help="ingest the configured documentation before serving")
+    parser.add_argument("--snapshot", help="load a corpus snapshot (python -m src.snapshot export) before serving")
+    args = parser.parse_args()
+
+    from .llm import StubBackend
+    from .rag import SmartAPIAssistant
+    if args.load:
+        from .jobs import get_ingest_jobs
+        from .utils import API_DOCS_URLS
+        job = get_ingest_jobs().start([url for urls in API_DOCS_URLS.values() for url in urls])
+        job.wait()
+        logger.info(f"Ingest {job.status}: {job.progress()}")
+    elif args.snapshot:
+        from .embeddings import EmbeddingsManager
+        EmbeddingsManager().load_snapshot(args.snapshot)
+
+    assistant = SmartAPIAssistant(llm=StubBackend(args.stub_latency) if args.stub_llm else None)
+    try:
+        asyncio.run(serve(RAGService(assistant), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Portable snapshots of an ingested corpus: build the index once, load it on any number of nodes.
+
+A snapshot is a zip archive holding every chunk's ID, text and metadata
+(chunks.jsonl), their embeddings (embeddings.npy, row-aligned with the chunks),
+the page manifest, and a header stamped with the embedding model and ingest
+version that recorded a SHA-256 per file. Loading one skips scraping and
+embedding entirely, and leaves the node ready for a warm start.
+
+Usage:
+  python -m src.snapshot export corpus.zip [--float16]
+  python -m src.snapshot import corpus.zip
+  python -m src.snapshot inspect corpus.zip
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import time
+import zipfile
+from typing import TYPE_CHECKING, Any, Dict
+import numpy as np
+from .chunking import CHUNKER_VERSION
+from .utils import atomic_write, logger
+
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingsManager
+
+SNAPSHOT_FORMAT = 1
+HEADER_FILE = "snapshot.json"
+
+def export_snapshot(manager: "EmbeddingsManager", path: str, dtype: str = "float32",
+                    page_size: int = 1000) -> Dict[str, Any]:
+    """Write ``manager``'s chunks, embeddings and manifest to a snapshot at ``path``; returns its header.
+
+    Rows are sorted by chunk ID, so the same corpus always produces the same files.
+    """
+    ids, documents, metadatas, embeddings = [], [], [], []
+    for offset in range(0, manager.collection.count(), page_size):
+        batch = manager.collection.get(include=['documents', 'metadatas', 'embeddings'], limit=page_size, offset=offset)
+        ids += batch['ids']
+        documents += batch['documents']
+        metadatas += batch['metadatas']
+        embeddings.append(np.asarray(batch['embeddings'], dtype=np.float32))
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    vectors = np.concatenate(embeddings)[order].astype(dtype) if embeddings else np.empty((0, 0), dtype=dtype)
+
+    buffer = io.BytesIO()
+    np.save(buffer, vectors)
+    chunks = "".join(json.dumps({"id": ids[i], "document": documents[i], "metadata": metadatas[i]},
+                                ensure_ascii=False, sort_keys=True) + "\n" for i in order)
+    manifest = json.dumps({"pages": manager.manifest.pages, "corpus": manager.manifest.corpus}, sort_keys=True)
+    files = {"embeddings.npy": buffer.getvalue(), "chunks.jsonl": chunks.encode("utf-8"),
+             "manifest.json": manifest.encode("utf-8")}
+    header = {
+        "format": SNAPSHOT_FORMAT, "model_name": manager.model_name, "ingest_version": manager.ingest_version,
+        "chunker_version": CHUNKER_VERSION, "count": len(ids), "dimension": int(vectors.shape[1]) if len(ids) else 0,
+        "dtype": vectors.dtype.name, "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": {name: {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)} for name, data in files.items()}
+    }
+
+    with atomic_write(path, 'wb') as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(HEADER_FILE, json.dumps(header, indent=2))
+        for name, data in files.items():
+            archive.writestr(name, data)
+    logger.info(f"Exported {len(ids)} chunks to snapshot {path}")
+    return header
+
+def read_header(path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read(HEADER_FILE))
+
+def import_snapshot(manager: "EmbeddingsManager", path: str, batch_size: int = 1000) -> Dict[str, Any]:
+    """Replace ``manager``'s chunks, BM25 index and manifest with a snapshot's; returns its header.
+
+    Raises ValueError, before anything is changed, when the snapshot was built
+    by another embedding model or ingest version, or a file fails its checksum.
+    """
+    with zipfile.ZipFile(path) as archive:
+        header = json.loads(archive.read(HEADER_FILE))
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format {header.get('format')!r}; expected {SNAPSHOT_FORMAT}")
+        for key, current in (("model_name", manager.model_name), ("ingest_version", manager.ingest_version)):
+            if header.get(key) != current:
+                raise ValueError(f"Snapshot {key} {header.get(key)!r} does not match this node's {current!r}")
+        files = {}
+        for name, expected in header["files"].items():
+            files[name] = archive.read(name)
+            if hashlib.sha256(files[name]).hexdigest() != expected["sha256"]:
+                raise ValueError(f"Snapshot file {name} fails its SHA-256 check")
+
+    vectors = np.load(io.BytesIO(files["embeddings.npy"])).astype(np.float32, copy=False)
+    rows = [json.loads(line) for line in files["chunks.jsonl"].decode("utf-8").splitlines()]
+    manifest = json.loads(files["manifest.json"])
+    if not len(rows) == len(vectors) == header["count"]:
+        raise ValueError(f"Snapshot holds {len(rows)} chunks and {len(vectors)} embeddings; expected {header['count']}")
+
+    manager.clear()
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        manager.write_chunks([row["id"] for row in batch], [row["document"] for row in batch],
+                             [row["metadata"] for row in batch], vectors[i:i + batch_size])
+    for url, page in manifest["pages"].items():
+        manager.manifest.update(url, **page)
+    manager.manifest.set_corpus(**manifest["corpus"])
+    manager.save_state()
+    logger.info(f"Imported {len(rows)} chunks from snapshot {path}")
+    return header
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import or inspect RAGify corpus snapshots")
+    parser.add_argument("command", choices=["export", "import", "inspect"])
+    parser.add_argument("path", help="snapshot file")
+    parser.add_argument("--collection", default="api_docs")
+    parser.add_argument("--float16", action="store_true", help="store embeddings as float16 (half the size)")
+    args = parser.parse_args()
+
+    if args.command == "inspect":
+        print(json.dumps(read_header(args.path), indent=2))
+        return
+    from .embeddings import EmbeddingsManager
+    manager = EmbeddingsManager(collection_name=args.collection)
+    if args.command == "export":
+        header = export_snapshot(manager, args.path, "float16" if args.float16 else "float32")
+    else:
+        header = import_snapshot(manager, args.path)
+    print(f"{args.command}ed {header['count']} chunks ({header['model_name']}, {header['ingest_version']})")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,120 @@
+import hashlib
+import json
 import logging
-from typing import List
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RAGify")
 
+CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Semantic answer cache: minimum cosine similarity for a hit, entry lifetime, capacity
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+
+# Query embedding cache: capacity, and whether to persist it next to the Chroma data
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_PERSIST = os.getenv("QUERY_CACHE_PERSIST", "1") == "1"
+
+# Token-aware chunking: max tokens per chunk (0 = the embedding model's limit), and the
+# token overlap between pieces of a block too long for one chunk
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
+# Ingest pipeline: chunks per encoder call, max seconds a partial batch waits,
+# and the bound on each inter-stage queue
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "50"))
+EMBED_FLUSH_TIMEOUT = float(os.getenv("EMBED_FLUSH_TIMEOUT", "0.5"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+# Multi-process encoding: worker processes (1 = encode in-process), and the smallest
+# batch worth sharding, since each call pays inter-process transfer costs; with more
+# than one worker, ingest batches are raised to at least this size
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_MP_MIN_TEXTS = int(os.getenv("EMBED_MP_MIN_TEXTS", "256"))
+
+# Encoder backend: "torch" (sentence-transformers), or ONNX Runtime with an fp32 ("onnx") or
+# int8-quantized ("onnx-int8") export, made once into EMBED_ONNX_DIR and used only if its
+# embeddings stay within EMBED_PARITY_MIN cosine of PyTorch's; otherwise torch is used
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", "./onnx_models")
+EMBED_PARITY_MIN = float(os.getenv("EMBED_PARITY_MIN", "0.99"))
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", "0"))
+
+# Warm start: become query-ready from a compatible persisted collection instead of
+# re-ingesting, and optionally refresh changed pages in the background afterwards
+WARM_START = os.getenv("WARM_START", "1") == "1"
+WARM_START_REFRESH = os.getenv("WARM_START_REFRESH", "0") == "1"
+
+# Hybrid retrieval: fuse BM25 results with vector results by reciprocal rank
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Vector index: distance space ("cosine", "l2" or "ip"), HNSW graph degree (M) and the candidate
+# list sizes used while building and while querying. A collection built with a different space,
+# M or construction_ef is rebuilt on startup; search_ef is changed in place where Chroma allows it
+CHROMA_SPACE = os.getenv("CHROMA_SPACE", "cosine")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))
+HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "100"))
+
+# Vector store: "chroma" (persistent HNSW index) or "numpy" (exact search over an in-memory matrix
+# saved as a memory-mapped .npy file, faster for corpora up to tens of thousands of chunks),
+# and the numpy store's element type ("float32", or "float16": half the memory and disk, slower queries)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma")
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")
+
+# Retrieval: nearest chunks fetched per requested result (before the one-chunk-per-URL dedup),
+# and the lowest cosine similarity a chunk may have to be used
+SEARCH_OVERFETCH = int(os.getenv("SEARCH_OVERFETCH", "3"))
+MIN_SIMILARITY = float(os.getenv("MIN_SIMILARITY", "0.1"))
+
+# LLM backend: "groq" or the offline "stub"; Groq model, request timeout in seconds,
+# retries (jittered exponential backoff from LLM_RETRY_BACKOFF seconds) and pooled connections;
+# the stub's fixed latency and per-token streaming delay
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))
+LLM_STUB_TOKEN_LATENCY = float(os.getenv("LLM_STUB_TOKEN_LATENCY", "0"))
+
+# LLM context budget: the token window to fill (a cost ceiling below the model's own limit),
+# tokens reserved for the answer, and the most tokens of conversation history to resend
+LLM_CONTEXT_WINDOW = int(os.getenv("LLM_CONTEXT_WINDOW", "8192"))
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "800"))
+LLM_HISTORY_TOKENS = int(os.getenv("LLM_HISTORY_TOKENS", "1500"))
+
+# Optional cross-encoder re-ranking of retrieval candidates: on/off, model, per-query
+# time budget in milliseconds, and the most candidates scored per query
+RERANK = os.getenv("RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "250"))
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "15"))
+
+# Headless service (python -m src.service): bind address, requests answered at once,
+# requests allowed to wait beyond that before 503s, and query-encoding batch window/size
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8000"))
+SERVICE_MAX_CONCURRENCY = int(os.getenv("SERVICE_MAX_CONCURRENCY", "8"))
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "32"))
+SERVICE_BATCH_WINDOW_MS = float(os.getenv("SERVICE_BATCH_WINDOW_MS", "5"))
+SERVICE_MAX_BATCH = int(os.getenv("SERVICE_MAX_BATCH", "32"))
+
+# Scraper concurrency: total worker threads, simultaneous requests per host,
+# and the minimum gap in seconds between request starts on the same host
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "8"))
+SCRAPER_PER_HOST = int(os.getenv("SCRAPER_PER_HOST", "2"))
+SCRAPER_DELAY = float(os.getenv("SCRAPER_DELAY", "0.5"))
+
 API_DOCS_URLS = {
     "anthropic": [
         "https://docs.anthropic.com/en/api/messages",
@@ -25,29 +136,69 @@ API_DOCS_URLS = {
     ]
 }
 
+# Query keywords that route retrieval to one vendor's docs; names match APIDocsScraper._get_source
+SOURCE_KEYWORDS = {
+    "Claude API": ("claude", "anthropic"),
+    "Gemini API": ("gemini", "google"),
+    "GitHub API": ("github",)
+}
+ALL_SOURCES = "all"
+
+def detect_source(query: str) -> Optional[str]:
+    text = query.lower()
+    matches = [source for source, words in SOURCE_KEYWORDS.items()
+               if any(re.search(rf"\b{word}\b", text) for word in words)]
+    # Comparisons across vendors ("Claude vs Gemini") search everything
+    return matches[0] if len(matches) == 1 else None
+
+# Word-or-punctuation tokens, for chunk packing and the chat model's token estimate
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+CODE_FENCE = "```"
+
 def clean_text(text: str) -> str:
     if not text: return ""
     return " ".join(text.split()).replace('\u00a0', ' ').strip()
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
-    if len(text) <= chunk_size: return [text]
-    
-    chunks, start = [], 0
-    while start < len(text):
-        end = start + chunk_size
-        if end < len(text):
-            # Break at sentence or word boundary
-            sentence_end = text.rfind('.', start, end)
-            if sentence_end > start + chunk_size // 2:
-                end = sentence_end + 1
-            else:
-                word_end = text.rfind(' ', start, end)
-                if word_end > start + chunk_size // 2:
-                    end = word_end
-        
-        chunk = text[start:end].strip()
-        if chunk: chunks.append(chunk)
-        start = end - overlap
-        if start >= len(text): break
-    
-    return chunks
\ No newline at end of file
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w') -> Iterator[IO]:
+    """Open a temp file beside ``path`` that replaces it only if the block completes.
+
+    Readers, and a crash mid-write, never see a partial file; each write gets
+    its own temp name, so concurrent saves can't clobber one another's.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs):
+    """Save ``data`` as JSON through atomic_write.
+
+    ``data`` may also be text already produced by json.dumps, for callers that
+    must serialise under their own lock but write outside it.
+    """
+    with atomic_write(path) as f:
+        if isinstance(data, str):
+            f.write(data)
+        else:
+            json.dump(data, f, **dump_kwargs)
+
+def read_json(path: str, description: str = "file") -> Optional[Any]:
+    """Parsed JSON at ``path``, or None when it is missing or unreadable (the latter logged)."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {description} {path}: {e}")
+        return None
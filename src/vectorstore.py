@@ -0,0 +1,188 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from .utils import logger, atomic_write, atomic_write_json, read_json
+
+# Same contract as a Chroma collection built with these settings: distances are 1 - cosine similarity
+NUMPY_INDEX = {"space": "cosine", "M": None, "construction_ef": None, "search_ef": None}
+
+class NumpyVectorStore:
+    """Exact in-memory vector index with the subset of the Chroma collection API EmbeddingsManager uses.
+
+    Normalized embeddings live in one contiguous float32 matrix (float16 halves
+    memory and disk, but numpy converts it on every query, several times slower),
+    with IDs, documents and metadata in parallel lists, so a query is a single
+    matrix-vector product and an ``argpartition`` for the top k. ``save()``
+    writes ``<path>.npy`` plus a JSON sidecar; the matrix is opened again
+    memory-mapped, so startup doesn't read vectors that are never touched.
+    Equality ``where`` filters are answered from per-key code arrays.
+    """
+
+    def __init__(self, path: str, name: str = "api_docs", dtype: str = "float32"):
+        self.path = path
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        # where-filter key -> (code per row, value -> code); dropped on every write
+        self._columns: Dict[str, Any] = {}
+        self._load()
+
+    def count(self) -> int:
+        return self._size
+
+    def upsert(self, ids: Sequence[str], embeddings, documents: Optional[Sequence[str]] = None,
+               metadatas: Optional[Sequence[Dict[str, Any]]] = None):
+        vectors = self._normalize(embeddings)
+        documents = documents if documents is not None else [""] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.empty((0, vectors.shape[1]), dtype=self.dtype)
+            elif vectors.shape[1] != self._vectors.shape[1]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's {self._vectors.shape[1]}")
+            self._columns = {}
+            self._writable(self._size + len(ids))
+            for doc_id, vector, document, meta in zip(ids, vectors, documents, metadatas):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._append_row(doc_id)
+                self._vectors[row] = vector
+                self._documents[row] = document
+                self._metadatas[row] = dict(meta or {})
+
+    add = upsert
+
+    def delete(self, ids: Sequence[str]):
+        with self._lock:
+            self._columns = {}
+            self._writable(self._size)
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is None: continue
+                # Move the last row into the gap so the matrix stays contiguous
+                last = self._size - 1
+                if row != last:
+                    self._vectors[row] = self._vectors[last]
+                    for column in (self._ids, self._documents, self._metadatas):
+                        column[row] = column[last]
+                    self._rows[self._ids[row]] = row
+                for column in (self._ids, self._documents, self._metadatas):
+                    column.pop()
+                self._size = last
+
+    def get(self, ids: Optional[Sequence[str]] = None, include: Sequence[str] = ('documents', 'metadatas'),
+            limit: Optional[int] = None, offset: Optional[int] = None, where: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+            else:
+                rows = list(np.flatnonzero(self._where_mask(where))) if where else range(self._size)
+                rows = list(rows)[offset or 0:None if limit is None else (offset or 0) + limit]
+            return self._records(rows, include)
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = ('documents', 'metadatas', 'distances')):
+        queries = self._normalize(query_embeddings).astype(np.float32, copy=False)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+        with self._lock:
+            mask = self._where_mask(where) if where else None
+            k = min(n_results, self._size if mask is None else int(mask.sum()))
+            if k:
+                # float16 storage is converted for the product, which costs more than the product itself
+                scores = self._vectors[:self._size] @ queries.T
+                if mask is not None:
+                    # Cheaper than gathering the matching rows into a copy first
+                    scores[~mask] = -np.inf
+            for column in range(len(queries)):
+                top = np.argpartition(-scores[:, column], k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+                top = top[np.argsort(-scores[top, column], kind="stable")] if k else top
+                record = self._records(top, include)
+                for key in ("ids", "documents", "metadatas", "embeddings"):
+                    results[key].append(record.get(key))
+                results["distances"].append((1.0 - scores[top, column]).tolist() if k else [])
+        return {key: value for key, value in results.items() if key == "ids" or key in include}
+
+    def save(self):
+        with self._lock:
+            vectors = np.ascontiguousarray(self._vectors[:self._size]) if self._vectors is not None else None
+            sidecar = {"name": self.name, "dtype": self.dtype.name, "rows": self._size,
+                       "ids": list(self._ids), "documents": list(self._documents), "metadatas": list(self._metadatas)}
+        if vectors is not None:
+            with atomic_write(f"{self.path}.npy", 'wb') as f:
+                np.save(f, vectors)
+        atomic_write_json(f"{self.path}.json", sidecar)
+
+    def clear(self):
+        with self._lock:
+            self._vectors, self._size, self._columns = None, 0, {}
+            self._ids, self._documents, self._metadatas, self._rows = [], [], [], {}
+
+    def _load(self):
+        sidecar = read_json(f"{self.path}.json", "vector store")
+        if sidecar is None: return
+        try:
+            vectors = np.load(f"{self.path}.npy", mmap_mode='r') if sidecar["rows"] else None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable vector store {self.path}: {e}")
+            return
+        if vectors is not None and (len(vectors) != sidecar["rows"] or vectors.dtype != self.dtype):
+            # Interrupted save, or a different VECTOR_STORE_DTYPE; an empty store makes ingest rebuild it
+            logger.warning(f"Ignoring vector store {self.path}: {len(vectors)} {vectors.dtype} rows, "
+                           f"expected {sidecar['rows']} {self.dtype}")
+            return
+        self._vectors, self._size = vectors, sidecar["rows"]
+        self._ids, self._documents, self._metadatas = sidecar["ids"], sidecar["documents"], sidecar["metadatas"]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+    def _normalize(self, embeddings) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _writable(self, rows: int):
+        # The loaded matrix is a read-only memory map; the first write copies it into memory
+        current = self._vectors
+        if current is None: return
+        if isinstance(current, np.memmap) or len(current) < rows:
+            capacity = max(rows, int(len(current) * 1.5) + 64)
+            grown = np.empty((capacity, current.shape[1]), dtype=self.dtype)
+            grown[:self._size] = current[:self._size]
+            self._vectors = grown
+
+    def _append_row(self, doc_id: str) -> int:
+        row = self._size
+        self._ids.append(doc_id)
+        self._documents.append("")
+        self._metadatas.append({})
+        self._rows[doc_id] = row
+        self._size += 1
+        return row
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(self._size, dtype=bool)
+        for key, value in where.items():
+            if key not in self._columns:
+                vocab: Dict[Any, int] = {}
+                codes = np.fromiter((vocab.setdefault(meta.get(key), len(vocab)) for meta in self._metadatas),
+                                    dtype=np.int32, count=self._size)
+                self._columns[key] = (codes, vocab)
+            codes, vocab = self._columns[key]
+            mask &= codes == vocab.get(value, -1)
+        return mask
+
+    def _records(self, rows, include: Sequence[str]) -> Dict[str, Any]:
+        record = {"ids": [self._ids[row] for row in rows]}
+        if 'documents' in include:
+            record["documents"] = [self._documents[row] for row in rows]
+        if 'metadatas' in include:
+            record["metadatas"] = [self._metadatas[row] for row in rows]
+        if 'embeddings' in include:
+            record["embeddings"] = (np.asarray(self._vectors[list(rows)], dtype=np.float32) if len(rows)
+                                    else np.empty((0, 0), dtype=np.float32))
+        return record
@@ -1,6 +1,17 @@
 import streamlit as st
 import os
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+# Search scope choices; values are source names from src.utils.SOURCE_KEYWORDS,
+# "all" (src.utils.ALL_SOURCES) to search everything, or None to detect from the question
+SOURCE_FILTERS = {
+    "🔎 Auto-detect from question": None,
+    "🌐 All APIs": "all",
+    "🟡 Anthropic Claude": "Claude API",
+    "🔵 Google Gemini": "Gemini API",
+    "⚫ GitHub API": "GitHub API"
+}
 
 class RAGifyUI:
     """UI Components for RAGify API Docs Explorer"""
@@ -599,6 +610,20 @@ class RAGifyUI:
             else:
                 st.warning("⚠️ Load documentation first")
             
+            st.selectbox(
+                "🎯 Search scope:",
+                list(SOURCE_FILTERS),
+                key="source_filter",
+                help="Restrict retrieval to one API's documentation"
+            )
+            
+            st.checkbox(
+                "⏱️ Show stage timings",
+                value=os.getenv("DEBUG_TIMINGS", "0") == "1",
+                key="debug_timings",
+                help="Show how long encoding, retrieval, context building and the LLM took for each answer"
+            )
+            
             st.markdown("---")
             
             reset_clicked = st.button("🔄 Reset Application")
@@ -627,6 +652,19 @@ class RAGifyUI:
             
             return groq_key, load_docs_clicked, reset_clicked
     
+    def selected_source(self):
+        """Return the source filter chosen in the sidebar"""
+        return SOURCE_FILTERS.get(st.session_state.get('source_filter'))
+    
+    def render_cache_stats(self, stats: Dict[str, Any]):
+        """Render answer and query-embedding cache counters in the sidebar"""
+        answers, queries = stats['answers'], stats['query_embeddings']
+        with st.sidebar:
+            st.caption(f"⚡ Answer cache: {answers['hits']} hits • {answers['misses']} misses • "
+                       f"{answers['entries']} cached")
+            st.caption(f"🧮 Query embeddings: {queries['hits']} hits • {queries['misses']} misses • "
+                       f"{queries['entries']}/{queries['max_entries']} cached")
+    
     def render_main_interface(self, groq_key: str, docs_loaded: bool):
         """Render the main chat interface"""
         if not groq_key:
@@ -667,7 +705,49 @@ class RAGifyUI:
             for i, source in enumerate(result["sources"], 1):
                 with st.expander(f"📄 {source['source']} • {source['similarity']:.0%} relevance"):
                     st.markdown(f"**📌 Title:** {source['title']}")
+                    if source.get('section'):
+                        st.markdown(f"**🧭 Section:** {source['section']}")
                     st.markdown(f"**🔗 URL:** [{source['url']}]({source['url']})")
+        
+        budget = result.get("context_budget")
+        if budget:
+            st.caption(
+                f"🧮 Prompt budget: {budget['used']:,} of {budget['context_window']:,} tokens "
+                f"({budget['docs']:,} docs · {budget['history']:,} history · {budget['answer_reserved']:,} reserved for the answer); "
+                f"{budget['docs_used']} sources used, {budget['docs_trimmed']} trimmed"
+            )
+        
+        if st.session_state.get('debug_timings') and result.get("timings"):
+            self.render_timings(result["timings"])
+    
+    def render_timings(self, timings: List[Dict[str, Any]]):
+        """Render the per-stage timings of one answer as a debug panel"""
+        total = sum(span["ms"] for span in timings)
+        with st.expander(f"⏱️ Stage timings • {total:,.0f} ms"):
+            for span in timings:
+                share = span["ms"] / total if total else 0.0
+                status = "" if span["ok"] else " ⚠️ failed"
+                st.markdown(f"`{span['stage']:<15}` {span['ms']:>9,.1f} ms · {share:.0%}{status}")
+    
+    def render_streaming_response(self, chunks: Iterable[str]) -> str:
+        """Render the AI response as it streams in and return the full text"""
+        placeholder = st.empty()
+        parts, last_paint = [], 0.0
+        
+        for chunk in chunks:
+            parts.append(chunk)
+            # Throttle repaints; every token would flood the websocket
+            if time.monotonic() - last_paint > 0.05:
+                placeholder.markdown(
+                    f'<div class="response-header">🤖 AI Response</div>'
+                    f'<div class="chat-message">{"".join(parts)}▌</div>',
+                    unsafe_allow_html=True
+                )
+                last_paint = time.monotonic()
+        
+        # The final answer is drawn by render_response together with its sources
+        placeholder.empty()
+        return "".join(parts)
     
     def render_quick_questions(self, on_question_click):
         """Render popular questions section"""
@@ -699,6 +779,38 @@ class RAGifyUI:
         status.text(progress_text)
         return progress, status
     
+    def show_ingest_progress(self, poll: Callable[[], Dict[str, Any]], interval: float = 0.5):
+        """Live ingest progress from job snapshots, refreshed by its own fragment.
+        
+        Only the fragment reruns every ``interval`` seconds, so the rest of the
+        page stays usable during the load; once the job ends the whole app reruns.
+        """
+        @st.fragment(run_every=interval)
+        def refresh():
+            snapshot = poll()
+            self.show_loading_progress(
+                f"📖 Pages {snapshot.get('pages_fetched', 0) + snapshot.get('pages_failed', 0)}"
+                f"/{snapshot.get('pages_total', 0)} · "
+                f"🧮 Embedded {snapshot.get('chunks_embedded', 0)} · "
+                f"💾 Written {snapshot.get('chunks_written', 0)}/{snapshot.get('chunks_planned', 0)} chunks "
+                f"({snapshot.get('elapsed', 0):.0f}s)",
+                self._ingest_fraction(snapshot)
+            )
+            if snapshot.get('status') in ("done", "failed"):
+                st.rerun()
+        
+        refresh()
+    
+    @staticmethod
+    def _ingest_fraction(snapshot: Dict[str, Any]) -> float:
+        total = snapshot.get('pages_total', 0)
+        if snapshot.get('status') == "done": return 1.0
+        if not total: return 0.05
+        pages = (snapshot.get('pages_fetched', 0) + snapshot.get('pages_failed', 0)) / total
+        planned = snapshot.get('chunks_planned', 0)
+        written = snapshot.get('chunks_written', 0) / planned if planned else pages
+        return min(0.99, 0.05 + 0.45 * pages + 0.5 * written)
+    
     def show_success_status(self, message: str):
         """Show success status"""
         st.markdown(f'<div class="status-success">{message}</div>', unsafe_allow_html=True)
\ No newline at end of file